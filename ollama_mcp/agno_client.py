@@ -2,11 +2,14 @@
 Agnoフレームワークを活用した統合MCPクライアント
 """
 import asyncio
+import atexit
 import os
-import json
 import aiohttp
+import orjson
+import httpx
+import ollama
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union, Callable
+from typing import Dict, List, Any, Optional, Union, Callable, Awaitable
 
 from agno.agent import Agent
 from agno.models.ollama import Ollama
@@ -16,6 +19,54 @@ from mcp import StdioServerParameters
 
 from ollama_mcp.debug_module import AgnoMCPDebugger
 
+# モデル一覧を取得できなかった場合に使用するモデル名
+DEFAULT_MODELS = ("gemma3:27b", "llama3", "mistral", "mixtral")
+
+# ホストごとに共有するOllamaクライアント（コネクションプールを再利用）
+_OLLAMA_CLIENTS: Dict[Optional[str], ollama.Client] = {}
+
+def get_ollama_client(host: Optional[str] = None) -> ollama.Client:
+    """
+    共有のOllamaクライアントを取得（初回呼び出し時に生成）
+    
+    Args:
+        host: Ollama API の URL（None の場合は OLLAMA_HOST または既定値）
+        
+    Returns:
+        Ollamaクライアント
+    """
+    client = _OLLAMA_CLIENTS.get(host)
+    if client is None:
+        client = ollama.Client(
+            host=host,
+            limits=httpx.Limits(max_keepalive_connections=8)
+        )
+        _OLLAMA_CLIENTS[host] = client
+        atexit.register(client._client.close)
+    return client
+
+# ホストごとに共有する非同期Ollamaクライアント
+_OLLAMA_ASYNC_CLIENTS: Dict[Optional[str], ollama.AsyncClient] = {}
+
+def get_ollama_async_client(host: Optional[str] = None) -> ollama.AsyncClient:
+    """
+    共有の非同期Ollamaクライアントを取得（初回呼び出し時に生成）
+    
+    Args:
+        host: Ollama API の URL（None の場合は OLLAMA_HOST または既定値）
+        
+    Returns:
+        非同期Ollamaクライアント
+    """
+    client = _OLLAMA_ASYNC_CLIENTS.get(host)
+    if client is None:
+        client = ollama.AsyncClient(
+            host=host,
+            limits=httpx.Limits(max_keepalive_connections=8)
+        )
+        _OLLAMA_ASYNC_CLIENTS[host] = client
+    return client
+
 class AgnoClient:
     """
     Agnoベースの統合クライアント
@@ -51,6 +102,10 @@ class AgnoClient:
         self.mcp_tools = None
         self.connected = False
         self.server_info = None
+        # 接続処理の排他（同時に来た接続要求で既存のセッションを閉じ合わないようにする）
+        self._connect_lock = asyncio.Lock()
+        # Ollama REST API 用のHTTPセッション（初回利用時に生成し、接続を再利用）
+        self._http_session: Optional[aiohttp.ClientSession] = None
         
         # モデルパラメータ
         self.model_params = {
@@ -58,6 +113,8 @@ class AgnoClient:
             "top_p": 0.9,
             "max_tokens": 2000
         }
+        # Ollamaに渡すオプション（パラメータ変更時のみ再構築し、各リクエストで共有）
+        self._ollama_options = self._build_ollama_options()
         
         self.debugger.log(f"Initialized AgnoClient with model {model_name}", "info")
     
@@ -65,6 +122,26 @@ class AgnoClient:
         """
         MCPサーバーに接続し、使用可能なツールを取得
         
+        同じサーバーに接続済みの場合は、再接続せずに既存のセッションを使い続ける
+        （再接続すると他のセッションで実行中のツール呼び出しが切断されるため）
+        
+        Args:
+            server_path: MCPサーバーのパスまたはURL
+            
+        Returns:
+            利用可能なツールのリスト
+        """
+        async with self._connect_lock:
+            if (not self.direct_mode and self.connected and self.mcp_tools
+                    and self.server_info and self.server_info["path"] == server_path):
+                self.debugger.log(f"Already connected to MCP server at {server_path}", "debug")
+                return self._list_tools()
+            return await self._connect_to_server(server_path)
+    
+    async def _connect_to_server(self, server_path: str) -> List[Dict[str, Any]]:
+        """
+        MCPサーバーに接続し直して使用可能なツールを取得
+        
         Args:
             server_path: MCPサーバーのパスまたはURL
             
@@ -80,6 +157,10 @@ class AgnoClient:
         
         self.debugger.log(f"Connecting to MCP server at {server_path}", "info")
         
+        # 既存の接続があれば先に閉じる
+        if self.mcp_tools:
+            await self.close()
+        
         try:
             # サーバーパラメータの設定
             self.server_parameters = StdioServerParameters(
@@ -87,11 +168,11 @@ class AgnoClient:
                 env={"PATH": os.environ.get("PATH", "/usr/local/bin")}
             )
             
-            # MCPツールの初期化
+            # MCPツールの初期化（stdioサブプロセスとセッションは接続中保持され、各クエリで再利用される）
             self.mcp_tools = await MCPTools(server_params=self.server_parameters).__aenter__()
             
-            # 利用可能なツールを取得
-            tools = self.mcp_tools.mcp_resources
+            # ハンドシェイクで取得したツール一覧
+            tools = self._list_tools()
             
             # エージェントのセットアップ
             await self.setup_agent(tools)
@@ -114,6 +195,22 @@ class AgnoClient:
             )
             raise
     
+    def _list_tools(self) -> List[Dict[str, Any]]:
+        """
+        接続中のMCPサーバーのツール一覧を取得
+        
+        Returns:
+            利用可能なツールのリスト
+        """
+        return [
+            {
+                "name": function.name,
+                "description": function.description,
+                "inputSchema": function.parameters
+            }
+            for function in self.mcp_tools.functions.values()
+        ]
+    
     async def setup_agent(self, tools: Optional[List[Dict[str, Any]]] = None) -> None:
         """
         エージェントをセットアップ
@@ -130,8 +227,14 @@ class AgnoClient:
             
             # エージェントの初期化
             self.agent = Agent(
-            model=Ollama(id=self.model_name),
+            model=Ollama(
+                id=self.model_name,
+                client=get_ollama_client(self.base_url),
+                async_client=get_ollama_async_client(self.base_url),
+                options=self._ollama_options
+            ),
            # tools=[DuckDuckGoTools()],
+            tools=[self.mcp_tools] if self.mcp_tools else [],
             markdown=True
             )
             
@@ -147,18 +250,18 @@ class AgnoClient:
     async def process_query(
         self, 
         query: str,
-        images: Optional[List[Union[str, Path]]] = None,
+        images: Optional[List[Union[str, Path, bytes]]] = None,
         stream: bool = False,
-        callback: Optional[Callable[[str], None]] = None
+        callback: Optional[Callable[[str], Awaitable[None]]] = None
     ) -> str:
         """
         テキストまたはマルチモーダルクエリを処理
         
         Args:
             query: ユーザーからの入力テキスト
-            images: 画像ファイルのパスのリスト（オプション）
+            images: 画像ファイルのパスまたは画像データ（bytes）のリスト（オプション）
             stream: ストリーミング応答を使用するかどうか
-            callback: ストリーミング時に呼び出すコールバック関数
+            callback: ストリーミング時にチャンクごとに await されるコールバック関数
             
         Returns:
             応答テキスト
@@ -187,6 +290,10 @@ class AgnoClient:
             agno_images = []
             if images:
                 for img_path in images:
+                    if isinstance(img_path, bytes):
+                        # メモリ上の画像データはファイルを経由せずにそのまま渡す
+                        agno_images.append(AgnoImage(content=img_path))
+                        continue
                     img_path = Path(img_path)
                     if img_path.exists():
                         self.debugger.log(f"Adding image: {img_path}", "debug")
@@ -202,8 +309,10 @@ class AgnoClient:
                 full_response = []
                 
                 self.debugger.log(f"Starting streaming response", "debug")
-                async for response_chunk in self.agent.astream(query, images=agno_images or None):
+                async for response_chunk in await self.agent.arun(query, images=agno_images or None, stream=True):
                     chunk_text = response_chunk.content  # .response から .content に変更
+                    if not chunk_text:
+                        continue
                     full_response.append(chunk_text)
                     
                     if callback:
@@ -241,23 +350,22 @@ class AgnoClient:
             モデル名のリスト
         """
         try:
-            base_url = self.integration.base_url if hasattr(self.integration, 'base_url') else "http://localhost:11434"
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{base_url}/api/tags") as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        models = data.get("models", [])
-                        
-                        # すべてのモデル名をリストとして返す
-                        model_names = [model["name"] for model in models]
-                        self.debugger.log(f"Retrieved {len(model_names)} models from API", "info")
-                        return model_names
-                    else:
-                        self.debugger.record_error(
-                            "model_fetch_error",
-                            f"Failed to fetch models: HTTP {response.status}"
-                        )
+            session = await self._get_http_session()
+            async with session.get(f"{self.base_url}/api/tags") as response:
+                if response.status == 200:
+                    # バイト列のまま orjson で解析（str へのデコードを省略）
+                    data = orjson.loads(await response.read())
+                    models = data.get("models", [])
+                    
+                    # すべてのモデル名をリストとして返す
+                    model_names = [model["name"] for model in models]
+                    self.debugger.log(f"Retrieved {len(model_names)} models from API", "info")
+                    return model_names
+                else:
+                    self.debugger.record_error(
+                        "model_fetch_error",
+                        f"Failed to fetch models: HTTP {response.status}"
+                    )
         except Exception as e:
             self.debugger.record_error(
                 "model_fetch_error", 
@@ -265,9 +373,8 @@ class AgnoClient:
             )
         
         # API呼び出しが失敗した場合はデフォルト値を返す
-        default_models = ["gemma3:27b", "llama3", "mistral", "mixtral"]
-        self.debugger.log(f"Using default model list: {default_models}", "warning")
-        return default_models
+        self.debugger.log(f"Using default model list: {list(DEFAULT_MODELS)}", "warning")
+        return list(DEFAULT_MODELS)
     
     def set_model(self, model_name: str) -> None:
         """
@@ -292,18 +399,39 @@ class AgnoClient:
             params: パラメータ辞書
         """
         self.model_params.update(params)
+        self._ollama_options = self._build_ollama_options()
         
         # エージェントが既に存在する場合は設定を更新
         if self.agent and hasattr(self.agent, 'model'):
-            for key, value in params.items():
-                # 属性が存在する場合のみ更新
-                if hasattr(self.agent.model, key):
-                    setattr(self.agent.model, key, value)
-                else:
-                    self.debugger.log(f"Warning: Model attribute {key} not found for update", "warning")
-            
+            self.agent.model.options = self._ollama_options
             self.debugger.log(f"Model parameters updated: {params}", "info")
     
+    def _build_ollama_options(self) -> Dict[str, Any]:
+        """
+        モデルパラメータからOllamaのリクエストオプションを構築
+        
+        Returns:
+            Ollamaのオプション辞書
+        """
+        options = dict(self.model_params)
+        # max_tokens は Ollama では num_predict として指定する
+        if "max_tokens" in options:
+            options["num_predict"] = options.pop("max_tokens")
+        return options
+    
+    async def _get_http_session(self) -> aiohttp.ClientSession:
+        """
+        共有HTTPセッションを取得（初回呼び出し時に生成）
+        
+        Returns:
+            aiohttp のクライアントセッション
+        """
+        if self._http_session is None or self._http_session.closed:
+            self._http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=60)
+            )
+        return self._http_session
+    
     async def close(self) -> None:
         """接続を閉じる"""
         if self.mcp_tools:
@@ -313,6 +441,10 @@ class AgnoClient:
             except Exception as e:
                 self.debugger.record_error("close_error", f"Error closing MCP tools: {str(e)}")
         
+        if self._http_session is not None:
+            await self._http_session.close()
+            self._http_session = None
+        
         self.connected = False
         self.agent = None
         self.mcp_tools = None
@@ -4,20 +4,39 @@ Gradio UIとAgno統合クライアント機能を含む
 """
 import argparse
 import asyncio
+import base64
 import os
 import time
 import json
 import io
 import tempfile
-from typing import List, Optional, Dict, Any, Tuple, Union, Callable
+from functools import lru_cache
+from io import BytesIO
+from typing import List, Optional, Dict, Any, Tuple, Union, Callable, AsyncIterator
 from pathlib import Path
 
 import gradio as gr
+import httpx
+import numpy as np
 import ollama
 from PIL import Image
 from loguru import logger
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
 
-from ollama_mcp.agno_client import AgnoClient  # 新しい統合クライアント
+# libjpeg-turboが利用可能であればJPEGエンコードに使用
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    _TURBO_JPEG: Optional["TurboJPEG"] = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    _TURBO_JPEG = None
+
+from ollama_mcp.agno_client import AgnoClient, DEFAULT_MODELS, get_ollama_client, get_ollama_async_client  # 新しい統合クライアント
 from ollama_mcp.debug_module import AgnoMCPDebugger
 
 class OllamaMCPApp:
@@ -30,7 +49,41 @@ class OllamaMCPApp:
     - チャット履歴の管理
     - エラーハンドリング
     """
-    def __init__(self, model_name: str = "gemma3:4b", debug_level: str = "info", direct_mode: bool = True):
+    # 応答スタイルごとにメッセージ末尾へ付加する指示
+    _STYLE_SUFFIX = {
+        "Detailed": " Please provide a detailed response.",
+        "Concise": " Keep the response concise.",
+        "Creative": " Feel free to be creative with your response."
+    }
+    
+    # 直接モード切り替え時の出力（サーバーパス, 接続ボタン, 接続結果, 接続状態）
+    # 取りうる状態は2つのみのため、更新内容を事前に生成しておく
+    _DIRECT_MODE_OUTPUTS = {
+        True: (
+            gr.update(interactive=False),
+            gr.update(interactive=False),
+            "✅ Direct mode enabled. Connected to Ollama directly.",
+            "<div style='color: green;'>Status: Direct mode (Connected)</div>"
+        ),
+        False: (
+            gr.update(interactive=True),
+            gr.update(interactive=True),
+            "",
+            "<div style='color: red;'>Status: Not connected</div>"
+        )
+    }
+    
+    # MCPサーバー接続後の接続状態表示
+    _SERVER_CONNECTED_STATUS = "<div style='color: green;'>Status: Connected</div>"
+    
+    # 送信前に縮小する画像の最大辺（ピクセル）とJPEG品質
+    MAX_IMAGE_DIM = 1568
+    JPEG_QUALITY = 85
+    # ファイルをBase64へ逐次変換する際の読み込みサイズ（3の倍数なのでチャンク境界でパディングが生じない）
+    B64_READ_CHUNK = 57 * 1024
+    
+    def __init__(self, model_name: str = "gemma3:4b", debug_level: str = "info", direct_mode: bool = True,
+                 history_limit: int = 40, history_token_limit: int = 6000):
         """
         OllamaMCPAppを初期化
         
@@ -38,6 +91,8 @@ class OllamaMCPApp:
             model_name: 使用するOllamaモデル名
             debug_level: デバッグログのレベル
             direct_mode: MCPサーバーを使用せず直接Ollamaと通信するかどうか (デフォルトはTrue)
+            history_limit: 保持するメッセージ履歴の最大件数
+            history_token_limit: 保持するメッセージ履歴の推定トークン数の上限
         """
         self.model_name = model_name
         self.debug_level = debug_level
@@ -45,12 +100,15 @@ class OllamaMCPApp:
         # 直接モードが有効な場合は接続状態をTrueに初期化
         self.is_connected = direct_mode
         
-        # Ollama公式クライアント（APIチェック用）
+        # Ollama公式クライアント（APIチェック用、接続はプロセス内で共有）
         try:
-            self.client = ollama.Client()
+            self.client = get_ollama_client()
         except Exception as e:
             logger.warning(f"Failed to initialize Ollama client: {e}. Please ensure Ollama is running.")
             self.client = None
+        
+        # 非同期Ollamaクライアント（複数メッセージの一括生成用）
+        self.async_client = get_ollama_async_client()
             
         self.debugger = AgnoMCPDebugger(level=debug_level)
         self.integration = AgnoClient(
@@ -61,9 +119,26 @@ class OllamaMCPApp:
         
         # 状態管理用の変数
         self.available_tools = []
+        self._tools_table_cache: Optional[List[List[str]]] = None
         self.server_path = None
         self.history = []
+        self.history_limit = history_limit
+        self.history_token_limit = history_token_limit
+        self._history_tokens = 0
         self.retries = 3
+        self.request_timeout = 120.0  # 秒（最初のチャンクが届くまで）
+        self.stream_idle_timeout = 60.0  # 秒（チャンク間の待ち時間）
+        
+        # ストリーミング時にUIへ反映する単位（文字数または経過時間）
+        self.stream_flush_chars = 64
+        self.stream_flush_interval = 0.05  # 秒
+        
+        # Ollamaへの同時リクエスト数の上限
+        self._infer_sem = asyncio.Semaphore(int(os.environ.get("OLLAMA_MAX_CONCURRENCY", "4")))
+        
+        # デバッグ情報のスナップショットキャッシュ (取得時刻, データ)
+        self._debug_snapshot_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._debug_snapshot_ttl = 1.0  # 秒
         
         # モデルパラメータ
         self.model_params = {
@@ -71,6 +146,15 @@ class OllamaMCPApp:
             "top_p": 0.9
         }
         
+        # モデル一覧のキャッシュ (取得時刻, モデル名のリスト)
+        self._models_cache: Optional[Tuple[float, List[str]]] = None
+        self._models_cache_ttl = 30.0  # 秒
+        # 実行中のモデル一覧取得（同時に来た要求で共有する）
+        self._models_inflight: Optional[asyncio.Task] = None
+        
+        # 画像ファイルのBase64エンコード結果のキャッシュ（同じファイルの再送信時に再エンコードしない）
+        self._encode_image_file_cached = lru_cache(maxsize=32)(self._encode_image_file)
+        
         self.debugger.log(f"OllamaMCPApp initialized with model {model_name}", "info")
     
     async def connect_to_server(self, server_path: str) -> str:
@@ -82,9 +166,17 @@ class OllamaMCPApp:
         if not server_path or server_path.strip() == "":
             return "❌ Server path is empty. Please provide a valid path."
         
+        # 同じサーバーに接続済みであれば、共有のMCPセッションを作り直さない
+        if self.is_connected and server_path == self.server_path:
+            return f"✅ Already connected to MCP server at {server_path}. Found {len(self.available_tools)} tools."
+        
         self.debugger.log(f"Connecting to MCP server at {server_path}", "info")
+        # 再接続時はツールテーブルとモデル一覧を作り直す
+        self._tools_table_cache = None
+        self._models_cache = None
         try:
             self.available_tools = await self.integration.connect_to_server(server_path)
+            self._tools_table_cache = self._build_tools_table()
             self.is_connected = True
             self.server_path = server_path
             return f"✅ Successfully connected to MCP server at {server_path}. Found {len(self.available_tools)} tools."
@@ -97,154 +189,413 @@ class OllamaMCPApp:
         if image is None:
             return None
         try:
-            import base64
-            from io import BytesIO
+            # 巨大な画像はモデル側でも縮小されるため、エンコード前に縮小しておく
+            if max(image.size) > self.MAX_IMAGE_DIM:
+                scale = self.MAX_IMAGE_DIM / max(image.size)
+                new_size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+                image = image.resize(new_size, Image.Resampling.LANCZOS)
             
-            # 画像をバイト列に変換
-            buffered = BytesIO()
-            image.save(buffered, format="JPEG")
-            img_bytes = buffered.getvalue()
+            # 画像をバイト列に変換してBase64エンコード
+            if _TURBO_JPEG is not None and image.mode == "RGB":
+                img_bytes = _TURBO_JPEG.encode(np.asarray(image), quality=self.JPEG_QUALITY, pixel_format=TJPF_RGB)
+                return base64.b64encode(img_bytes).decode('ascii')
             
-            # Base64エンコード
-            img_base64 = base64.b64encode(img_bytes).decode('utf-8')
-            return img_base64
+            # バッファをコピーせずにエンコードし、終了時に確実に解放する
+            with BytesIO() as buffered:
+                image.save(buffered, format="JPEG", quality=self.JPEG_QUALITY, optimize=False, progressive=False)
+                with buffered.getbuffer() as img_bytes:
+                    return base64.b64encode(img_bytes).decode('ascii')
         except Exception as e:
             self.debugger.record_error("image_conversion_error", f"Error converting image to bytes: {str(e)}")
             return None
     
+    def image_file_to_base64(self, path: str) -> Optional[str]:
+        """
+        画像ファイルをBase64エンコード
+        
+        そのまま送信できるJPEG（RGBかつ最大辺以下）はデコードせずにファイルの
+        内容を使用し、それ以外はRGBに変換してから再エンコードする。
+        結果はパス・更新時刻・サイズをキーにキャッシュする
+        
+        Args:
+            path: 画像ファイルのパス
+            
+        Returns:
+            Base64エンコードされた画像（エンコードに失敗した場合はNone）
+        """
+        st = os.stat(path)
+        try:
+            return self._encode_image_file_cached(str(path), st.st_mtime_ns, st.st_size)
+        except ValueError:
+            # 失敗は例外として扱いキャッシュしない（一時的なエラーでも次回は再度エンコードする）
+            return None
+    
+    def _encode_image_file(self, path: str, mtime_ns: int, size: int) -> str:
+        """
+        画像ファイルをBase64エンコード（mtime_ns と size はキャッシュキーとしてのみ使用）
+        
+        Args:
+            path: 画像ファイルのパス
+            mtime_ns: ファイルの更新時刻（ナノ秒）
+            size: ファイルサイズ（バイト）
+            
+        Returns:
+            Base64エンコードされた画像（エンコードに失敗した場合は ValueError を送出）
+        """
+        # Image.open はヘッダーのみを読み込み、ピクセルデータはデコードしない
+        with Image.open(path) as image:
+            if image.format == "JPEG" and image.mode == "RGB" and max(image.size) <= self.MAX_IMAGE_DIM:
+                return self._b64encode_file(path)
+            rgb_image = image.convert('RGB')
+        try:
+            img_base64 = self.image_to_bytes(rgb_image)
+        finally:
+            rgb_image.close()
+        if img_base64 is None:
+            raise ValueError(f"Failed to encode image: {path}")
+        return img_base64
+    
+    def _b64encode_file(self, path: str) -> str:
+        """
+        ファイル全体を読み込まずにチャンク単位でBase64エンコード
+        
+        Args:
+            path: ファイルのパス
+            
+        Returns:
+            Base64エンコードされたファイル内容
+        """
+        buf = bytearray()
+        with open(path, 'rb') as f:
+            while chunk := f.read(self.B64_READ_CHUNK):
+                buf += base64.b64encode(chunk)
+        return buf.decode('ascii')
+    
     def add_message(self, text_input: str, image_input: Optional[Image.Image] = None, 
-                   response_style: str = "Standard") -> Dict[str, Any]:
-        """メッセージを履歴に追加"""
-        message = {'role': 'user', 'content': text_input.strip()}
+                   response_style: str = "Standard", image_base64: Optional[str] = None) -> Dict[str, Any]:
+        """
+        メッセージを履歴に追加
         
+        Args:
+            text_input: メッセージ本文
+            image_input: 添付する画像（オプション）
+            response_style: 応答スタイル
+            image_base64: Base64エンコード済みの添付画像（オプション）
+            
+        Returns:
+            追加したメッセージ
+        """
         # スタイル設定の追加
-        if response_style == "Detailed":
-            message['content'] += " Please provide a detailed response."
-        elif response_style == "Concise":
-            message['content'] += " Keep the response concise."
-        elif response_style == "Creative":
-            message['content'] += " Feel free to be creative with your response."
+        suffix = self._STYLE_SUFFIX.get(response_style, "")
+        message = {'role': 'user', 'content': text_input.strip() + suffix}
         
         # 画像の追加
         if image_input is not None:
-            img_base64 = self.image_to_bytes(image_input)
+            try:
+                img_base64 = self.image_to_bytes(image_input)
+            finally:
+                # エンコード後は画像データを保持する必要がないため解放
+                image_input.close()
             if img_base64:
                 message['images'] = [img_base64]
+        elif image_base64:
+            message['images'] = [image_base64]
         
-        self.history.append(message)
+        self._append_history(message)
         return message
     
-    async def generate_response(self) -> str:
-        """応答を生成"""
-        for attempt in range(self.retries):
+    def _append_history(self, message: Dict[str, Any]) -> None:
+        """
+        履歴にメッセージを追加し、上限を超えた古いメッセージを削除
+        
+        件数と推定トークン数の両方の上限を適用する。システムメッセージと
+        最新のメッセージは削除しない
+        """
+        self.history.append(message)
+        self._history_tokens += self._estimate_tokens(message)
+        
+        i = 0
+        while i < len(self.history) - 1 and (
+            len(self.history) > self.history_limit
+            or self._history_tokens > self.history_token_limit
+        ):
+            if self.history[i].get('role') == 'system':
+                i += 1
+                continue
+            self._history_tokens -= self._estimate_tokens(self.history.pop(i))
+    
+    @staticmethod
+    def _estimate_tokens(message: Dict[str, Any]) -> int:
+        """メッセージのトークン数を簡易的に推定（単語数または文字数ベース）"""
+        content = message.get('content') or ""
+        return max(int(len(content.split()) * 1.3), len(content) // 4)
+    
+    def _record_retry(self, retry_state: RetryCallState) -> None:
+        """再試行前に失敗した試行を記録"""
+        self.debugger.record_error("response_generation_error", 
+            f"Error generating response (attempt {retry_state.attempt_number}): {retry_state.outcome.exception()}")
+    
+    @staticmethod
+    def _is_retryable(error: BaseException) -> bool:
+        """
+        再試行で回復する可能性のある一時的なエラーかどうかを判定
+        
+        Args:
+            error: 発生した例外
+            
+        Returns:
+            再試行すべき場合はTrue
+        """
+        # クライアント側の誤り (4xx) は再試行しても結果が変わらない
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code >= 500
+        if isinstance(error, ollama.ResponseError):
+            return error.status_code >= 500
+        return isinstance(error, (httpx.HTTPError, TimeoutError, ConnectionError))
+    
+    async def generate_responses_batch(self, messages_list: List[List[Dict[str, Any]]]) -> List[str]:
+        """
+        複数の会話に対する応答をまとめて生成
+        
+        各リクエストを並行して送信するため、Ollama側で OLLAMA_NUM_PARALLEL > 1 が
+        設定されていれば処理が重なり合う（同時実行数はセマフォで制限）
+        
+        Args:
+            messages_list: Ollama形式のメッセージリストのリスト
+            
+        Returns:
+            各会話に対する応答テキストのリスト
+        """
+        async def chat(messages: List[Dict[str, Any]]) -> str:
+            async with self._infer_sem:
+                response = await self.async_client.chat(
+                    model=self.model_name,
+                    messages=messages,
+                    options=self.model_params
+                )
+            return response['message']['content']
+        
+        return await asyncio.gather(*[chat(messages) for messages in messages_list])
+    
+    async def stream_response(self) -> AsyncIterator[str]:
+        """
+        応答をストリーミングで生成
+        
+        細かいチャンクごとにUIを更新しないよう、一定の文字数または
+        一定時間分のチャンクをまとめてから途中経過を返す。
+        生成全体の時間は制限せず、最初のチャンクまでとチャンク間の待ち時間に
+        それぞれタイムアウトを設ける（長くても進行中の応答は打ち切らない）。
+        最初のチャンクが届くまでの一時的なエラーはジッター付きの指数バックオフで再試行する
+        （表示を始めた応答は取り消せないため、それ以降は再試行しない）
+        
+        Yields:
+            その時点までの応答テキスト（最後は応答全体）
+        """
+        task: Optional[asyncio.Task] = None
+        try:
+            async for attempt in AsyncRetrying(
+                stop=stop_after_attempt(self.retries),
+                wait=wait_random_exponential(multiplier=0.1, max=5),
+                retry=retry_if_exception(self._is_retryable),
+                before_sleep=self._record_retry,
+                reraise=True
+            ):
+                with attempt:
+                    if task is not None:
+                        # 応答しなかった前回の試行を止めてから再試行する
+                        task.cancel()
+                    chunks, task = self._start_stream()
+                    chunk_text = await asyncio.wait_for(chunks.get(), timeout=self.request_timeout)
+                    if chunk_text is None:
+                        # チャンクを返さずに終了した場合は、エラーであればここで送出して再試行する
+                        await task
+            
+            response = ""
+            buffer: List[str] = []
+            buffered_chars = 0
+            last_flush = time.monotonic()
+            
+            while chunk_text is not None:
+                buffer.append(chunk_text)
+                buffered_chars += len(chunk_text)
+                now = time.monotonic()
+                if (buffered_chars >= self.stream_flush_chars
+                        or now - last_flush >= self.stream_flush_interval):
+                    response += "".join(buffer)
+                    buffer.clear()
+                    buffered_chars = 0
+                    last_flush = now
+                    yield response
+                chunk_text = await asyncio.wait_for(chunks.get(), timeout=self.stream_idle_timeout)
+            
+            # 残りのバッファを含む最終的な応答
+            response = await task
+            yield response
+        finally:
+            if task is not None and not task.done():
+                task.cancel()
+        
+        self._append_history({'role': 'assistant', 'content': response})
+    
+    def _start_stream(self) -> Tuple[asyncio.Queue, asyncio.Task]:
+        """
+        履歴の最後のメッセージに対するストリーミング応答の生成を開始
+        
+        Returns:
+            チャンクを受け取るキュー（終了時は None が入る）と生成タスクのタプル
+        """
+        chunks: asyncio.Queue = asyncio.Queue()
+        
+        async def on_chunk(chunk_text: str) -> None:
+            chunks.put_nowait(chunk_text)
+        
+        async def run_query() -> str:
             try:
-                # 画像パスのリストを作成（存在する場合）
-                image_paths = []
-                
-                # 一時ディレクトリを使用して画像を処理
-                with tempfile.TemporaryDirectory() as temp_dir_str:
-                    temp_dir = Path(temp_dir_str)
-                    
-                    # 画像がメッセージに含まれている場合
-                    if 'images' in self.history[-1]:
-                        for i, img_base64 in enumerate(self.history[-1]['images']):
-                            import base64
-                            # Base64デコード
-                            try:
-                                img_data = base64.b64decode(img_base64)
-                                img_path = temp_dir / f"image_{i}.jpg"
-                                with open(img_path, "wb") as f:
-                                    f.write(img_data)
-                                image_paths.append(str(img_path))
-                            except Exception as e:
-                                self.debugger.record_error("image_decode_error", f"Failed to decode image: {str(e)}")
-                                continue
-                    
-                    # 統合クライアントで応答を生成
-                    response = await self.integration.process_query(
-                        self.history[-1]['content'],
-                        images=image_paths if image_paths else None
-                    )
-                    
-                    # 一時ファイルは自動的にクリーンアップされる
-                
-                assistant_message = {
-                    'role': 'assistant', 
-                    'content': response
-                }
-                self.history.append(assistant_message)
-                return assistant_message['content']
-                
-            except Exception as e:
-                self.debugger.record_error("response_generation_error", 
-                    f"Error generating response (attempt {attempt + 1}): {str(e)}")
-                if attempt == self.retries - 1:
-                    return f"Error generating response after {self.retries} attempts: {str(e)}"
+                return await self._query_last_message(stream=True, callback=on_chunk)
+            finally:
+                # 終了（エラーを含む）を通知
+                chunks.put_nowait(None)
         
-        return "Failed to generate response after multiple attempts."
+        return chunks, asyncio.create_task(run_query())
+    
+    async def _query_last_message(self, **kwargs: Any) -> str:
+        """
+        履歴の最後のメッセージに対する応答を生成
+        
+        Args:
+            **kwargs: 統合クライアントの process_query に渡す追加の引数
+            
+        Returns:
+            応答テキスト
+        """
+        last_message = self.history[-1]
+        
+        # 画像はデコードしたデータをそのまま渡す（一時ファイルへの書き出しと再読み込みを省略）
+        if 'images' in last_message:
+            images = await asyncio.to_thread(self._decode_images, last_message['images'])
+            return await self._process_query(
+                last_message['content'],
+                images=images if images else None,
+                **kwargs
+            )
+        return await self._process_query(last_message['content'], **kwargs)
+    
+    async def _process_query(self, content: str, images: Optional[List[bytes]] = None, **kwargs: Any) -> str:
+        """統合クライアントで応答を生成（同時実行数を制限）"""
+        async with self._infer_sem:
+            return await self.integration.process_query(content, images=images, **kwargs)
+    
+    def _decode_images(self, images: List[str]) -> List[bytes]:
+        """
+        Base64エンコードされた画像をデコード
+        
+        Args:
+            images: Base64エンコードされた画像のリスト
+            
+        Returns:
+            デコードした画像データのリスト（デコードできなかった画像は除く）
+        """
+        decoded = []
+        for img_base64 in images:
+            try:
+                decoded.append(base64.b64decode(img_base64))
+            except Exception as e:
+                self.debugger.record_error("image_decode_error", f"Failed to decode image: {str(e)}")
+        return decoded
     
     async def chat_with_file(self, message: str, file: Optional[tempfile._TemporaryFileWrapper] = None, 
-                           chat_history: Optional[List] = None) -> Tuple[List, str]:
+                           chat_history: Optional[List[Dict[str, Any]]] = None
+                           ) -> AsyncIterator[Tuple[List[Dict[str, Any]], str]]:
         """
         メッセージと任意のファイルを処理してチャット履歴を更新
         
+        チャット履歴は messages 形式 ({'role': ..., 'content': ...}) で扱い、
+        ユーザーメッセージを先に表示してから応答を追加する
+        
         Args:
             message: ユーザーからの入力メッセージ
             file: アップロードされたファイル（オプション）
             chat_history: 現在のチャット履歴
             
-        Returns:
+        Yields:
             更新されたチャット履歴とクリアされた入力フィールド
         """
         if not message and not file:
-            return chat_history or [], ""
+            yield chat_history or [], ""
+            return
             
         chat_history = chat_history or []
+        chat_history.append({'role': 'user', 'content': message})
         
         # 画像ファイルの確認と処理
-        image = None
+        img_base64 = None
         if file:
             try:
-                image = Image.open(file.name)
+                # ファイル読み込みとエンコードはイベントループ外で実行
+                img_base64 = await asyncio.to_thread(self.image_file_to_base64, file.name)
                 self.debugger.log(f"Processed uploaded image: {file.name}", "debug")
             except Exception as e:
                 self.debugger.record_error("image_processing_error", f"Error processing image: {str(e)}")
-                chat_history.append((message, f"Error processing image: {str(e)}"))
-                return chat_history, ""
+                chat_history.append({'role': 'assistant', 'content': f"Error processing image: {str(e)}"})
+                yield chat_history, ""
+                return
         
         # 接続状態の確認
         if not self.is_connected and not self.direct_mode:
             response = "⚠️ Not connected to a MCP server. Please connect first in the Settings tab."
-            chat_history.append((message, response))
-            return chat_history, ""
+            chat_history.append({'role': 'assistant', 'content': response})
+            yield chat_history, ""
+            return
         
-        # メッセージを履歴に追加
-        chat_history.append((message, None))
+        # 応答生成前にユーザーメッセージを表示
+        yield chat_history, ""
         
         # 画像がある場合は画像を含むメッセージを追加
-        self.add_message(message, image)
+        self.add_message(message, image_base64=img_base64)
         
-        # 応答を生成
+        # 応答をストリーミングで生成
+        chat_history.append({'role': 'assistant', 'content': ""})
         try:
-            response = await self.generate_response()
-            chat_history[-1] = (message, response)
+            async for partial in self.stream_response():
+                chat_history[-1] = {'role': 'assistant', 'content': partial}
+                yield chat_history, ""
         except Exception as e:
             self.debugger.record_error("chat_error", f"Error in chat: {str(e)}")
-            chat_history[-1] = (message, f"Error: {str(e)}")
-        
-        return chat_history, ""
+            chat_history[-1] = {'role': 'assistant', 'content': f"Error: {str(e)}"}
+            yield chat_history, ""
     
-    async def handle_server_connection(self, server_path: str) -> str:
+    async def handle_server_connection(self, server_path: str) -> Tuple[str, str, List[List[str]]]:
         """
         サーバー接続ハンドラ
         
+        接続結果・接続状態・ツール一覧を1回のイベントでまとめて更新する
+        
         Args:
             server_path: MCPサーバーのパス
             
         Returns:
-            接続結果メッセージ
+            接続結果メッセージ、接続状態の表示、ツール情報のテーブル
+        """
+        message = await self.connect_to_server(server_path)
+        status = self._SERVER_CONNECTED_STATUS if self.is_connected else self._DIRECT_MODE_OUTPUTS[False][3]
+        return message, status, await self.get_tools_table()
+    
+    def toggle_direct_mode(self, direct_mode: bool) -> Tuple[Any, ...]:
+        """
+        直接モードを切り替え
+        
+        Args:
+            direct_mode: 直接モードを有効にするかどうか
+            
+        Returns:
+            サーバーパス、接続ボタン、接続結果、接続状態の更新内容
         """
-        return await self.connect_to_server(server_path)
+        self.direct_mode = direct_mode
+        self.integration.direct_mode = direct_mode
+        # 接続状態を設定
+        self.is_connected = direct_mode
+        
+        return self._DIRECT_MODE_OUTPUTS[bool(direct_mode)]
     
     def update_model_params(self, temperature: float, top_p: float) -> str:
         """
@@ -275,6 +626,12 @@ class OllamaMCPApp:
         Returns:
             変更結果メッセージ
         """
+        if not model_name:
+            return "❌ No model selected"
+        # 同じモデルが選択された場合はクライアントの設定を変更しない
+        if model_name == self.model_name:
+            return f"✅ Model is already set to {model_name}"
+        
         self.model_name = model_name
         self.integration.set_model(model_name)
         return f"✅ Model changed to {model_name}"
@@ -293,8 +650,11 @@ class OllamaMCPApp:
             # 正しい方法でモデル一覧を取得
             try:
                 # ollama list コマンドを使用してモデル一覧を取得 (最も信頼性の高い方法)
+                # CLIの実行完了を待つ間イベントループを止めないようワーカースレッドで実行
                 import subprocess
-                result = subprocess.run(['ollama', 'list'], capture_output=True, text=True, check=True)
+                result = await asyncio.to_thread(
+                    subprocess.run, ['ollama', 'list'], capture_output=True, text=True, check=True
+                )
                 
                 # 出力行を解析
                 lines = result.stdout.strip().split('\n')
@@ -315,8 +675,8 @@ class OllamaMCPApp:
             
             # CLI が失敗した場合は API を試す
             try:
-                # Python クライアントのネイティブメソッドを使用
-                response = await asyncio.to_thread(lambda: self.client.list())
+                # Python クライアントのネイティブメソッドを使用（非同期クライアントでスレッドを占有しない）
+                response = await self.async_client.list()
                 
                 # response オブジェクトを適切に処理する
                 models = []
@@ -339,13 +699,54 @@ class OllamaMCPApp:
                 self.debugger.log(f"API model fetch failed: {str(e)}", "warning")
             
             # どちらの方法も失敗した場合はデフォルト値を返す
-            default_models = ["gemma3:27b", "llama3", "mistral", "mixtral"]
-            self.debugger.log(f"Using default model list: {default_models}", "warning")
-            return default_models
+            self.debugger.log(f"Using default model list: {list(DEFAULT_MODELS)}", "warning")
+            return list(DEFAULT_MODELS)
             
         except Exception as e:
             self.debugger.record_error("model_list_error", f"Error getting available models: {str(e)}")
-            return ["gemma3:27b", "llama3", "mistral", "mixtral"]
+            return list(DEFAULT_MODELS)
+    
+    async def _maybe_load_models(self) -> Dict[str, Any]:
+        """
+        モデル一覧でドロップダウンを更新
+        
+        一覧はキャッシュし、有効期限内であればOllamaに問い合わせずに返す
+        （セッションごとにドロップダウンへ選択肢を設定する必要があるため）。
+        取得中に来た要求は同じ取得結果を待つ
+        
+        Returns:
+            ドロップダウンの更新内容
+        """
+        now = time.monotonic()
+        if self._models_cache is not None:
+            cached_at, models = self._models_cache
+            if now - cached_at < self._models_cache_ttl:
+                return self._model_choices_update(models)
+        
+        task = self._models_inflight
+        if task is None:
+            task = self._models_inflight = asyncio.create_task(self.get_available_models())
+            task.add_done_callback(lambda _: setattr(self, '_models_inflight', None))
+        # 待機中の1セッションが切断されても共有の取得処理はキャンセルしない
+        models = await asyncio.shield(task)
+        self._models_cache = (time.monotonic(), models)
+        return self._model_choices_update(models)
+    
+    def _model_choices_update(self, models: List[str]) -> Dict[str, Any]:
+        """
+        モデル選択ドロップダウンの更新内容を生成
+        
+        使用中のモデルが一覧にあれば選択状態として明示し、ない場合は選択値を変更しない
+        
+        Args:
+            models: モデル名のリスト
+            
+        Returns:
+            ドロップダウンの更新内容
+        """
+        if self.model_name in models:
+            return gr.update(choices=models, value=self.model_name)
+        return gr.update(choices=models)
     
     async def get_recent_logs(self, count: int = 20) -> List[Dict[str, Any]]:
         """
@@ -383,15 +784,50 @@ class OllamaMCPApp:
         """
         return self.debugger.get_errors(count)
     
+    async def get_debug_snapshot(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        ログ・ツールコール・エラーをまとめて取得
+        
+        連続した更新要求でデバッガーを何度も参照しないよう、
+        結果を短時間キャッシュする
+        
+        Returns:
+            ログ、ツールコール、エラーのタプル
+        """
+        now = time.monotonic()
+        if self._debug_snapshot_cache is not None:
+            cached_at, data = self._debug_snapshot_cache
+            if now - cached_at < self._debug_snapshot_ttl:
+                return data["logs"], data["tools"], data["errors"]
+        
+        data = {
+            "logs": self.debugger.get_recent_logs(20),
+            "tools": self.debugger.get_tool_calls(10),
+            "errors": self.debugger.get_errors(10)
+        }
+        self._debug_snapshot_cache = (now, data)
+        return data["logs"], data["tools"], data["errors"]
+    
     async def get_tools_table(self) -> List[List[str]]:
         """
         ツール情報をテーブル形式で取得
         
+        テーブルは接続時に生成したものを返す
+        
         Returns:
             ツール情報のテーブル（ヘッダーと行のリスト）
         """
+        return self._tools_table_cache or [["No tools available"]]
+    
+    def _build_tools_table(self) -> Optional[List[List[str]]]:
+        """
+        利用可能なツールからテーブルを生成
+        
+        Returns:
+            ツール情報のテーブル（ツールがない場合はNone）
+        """
         if not self.available_tools:
-            return [["No tools available"]]
+            return None
             
         # ヘッダー行とデータ行を含むリストを作成
         table = [["Name", "Description", "Parameters"]]
@@ -432,7 +868,7 @@ class OllamaMCPApp:
                 with gr.Tab("Chat"):
                     with gr.Row():
                         with gr.Column(scale=4):
-                            chat_interface = gr.Chatbot(height=600)
+                            chat_interface = gr.Chatbot(type='messages', height=600)
                             
                             with gr.Row():
                                 with gr.Column(scale=8):
@@ -450,29 +886,32 @@ class OllamaMCPApp:
                         
                         with gr.Column(scale=1):
                             # 接続状態表示を更新
-                            status_text = "Direct mode (Connected)" if self.direct_mode else "Not connected"
-                            status_color = "green" if self.direct_mode else "red"
-                            connection_status = gr.Markdown(
-                                f"<div style='color: {status_color};'>Status: {status_text}</div>"
-                            )
+                            connection_status = gr.Markdown(self._DIRECT_MODE_OUTPUTS[self.direct_mode][3])
                     
                     # イベントハンドラ
+                    # 会話履歴とエージェントは全セッションで共有しているため、チャットは1件ずつ処理する
                     send_btn.click(
                         fn=self.chat_with_file,
                         inputs=[msg_input, file_input, chat_interface],
-                        outputs=[chat_interface, msg_input]
+                        outputs=[chat_interface, msg_input],
+                        concurrency_limit=1,
+                        concurrency_id="chat"
                     )
                     
                     msg_input.submit(
                         fn=self.chat_with_file,
                         inputs=[msg_input, file_input, chat_interface],
-                        outputs=[chat_interface, msg_input]
+                        outputs=[chat_interface, msg_input],
+                        concurrency_limit=1,
+                        concurrency_id="chat"
                     )
                     
+                    # 即座に終わる処理はキューを経由せずに実行
                     clear_btn.click(
                         fn=lambda: ([], ""),
                         inputs=None,
-                        outputs=[chat_interface, msg_input]
+                        outputs=[chat_interface, msg_input],
+                        queue=False
                     )
                 
                 # デバッグタブ
@@ -507,6 +946,14 @@ class OllamaMCPApp:
                                 inputs=[],
                                 outputs=[errors_output]
                             )
+                    
+                    # ログ・ツールコール・エラーを一括更新
+                    refresh_debug = gr.Button("Refresh Debug")
+                    refresh_debug.click(
+                        fn=self.get_debug_snapshot,
+                        inputs=[],
+                        outputs=[logs_output, tool_calls_output, errors_output]
+                    )
                 
                 # ツールタブ
                 with gr.Tab("Tools"):
@@ -523,7 +970,7 @@ class OllamaMCPApp:
                     )
                 
                 # 設定タブ
-                with gr.Tab("Settings"):
+                with gr.Tab("Settings") as settings_tab:
                     with gr.Row():
                         with gr.Column():
                             gr.Markdown("## Server Connection")
@@ -541,38 +988,19 @@ class OllamaMCPApp:
                                 interactive=not self.direct_mode
                             )
                             connect_btn = gr.Button("Connect", interactive=not self.direct_mode)
-                            connection_result = gr.Markdown(
-                                f"{'✅ Direct mode enabled. Connected to Ollama directly.' if self.direct_mode else ''}"
-                            )
-                            
-                            # 直接モード切り替え関数
-                            def toggle_direct_mode(direct_mode):
-                                self.direct_mode = direct_mode
-                                self.integration.direct_mode = direct_mode
-                                # 接続状態を設定
-                                self.is_connected = direct_mode
-                                
-                                # ステータス表示テキストの更新
-                                status_text = "Direct mode (Connected)" if direct_mode else "Not connected"
-                                status_color = "green" if direct_mode else "red"
-                                
-                                return {
-                                    server_path: gr.update(interactive=not direct_mode),
-                                    connect_btn: gr.update(interactive=not direct_mode),
-                                    connection_result: "✅ Direct mode enabled. Connected to Ollama directly." if direct_mode else "",
-                                    connection_status: f"<div style='color: {status_color};'>Status: {status_text}</div>"
-                                }
+                            connection_result = gr.Markdown(self._DIRECT_MODE_OUTPUTS[self.direct_mode][2])
                             
                             direct_mode_checkbox.change(
-                                fn=toggle_direct_mode,
+                                fn=self.toggle_direct_mode,
                                 inputs=[direct_mode_checkbox],
-                                outputs=[server_path, connect_btn, connection_result, connection_status]
+                                outputs=[server_path, connect_btn, connection_result, connection_status],
+                                queue=False
                             )
                             
                             connect_btn.click(
                                 fn=self.handle_server_connection,
                                 inputs=[server_path],
-                                outputs=[connection_result]
+                                outputs=[connection_result, connection_status, tools_table]
                             )
                         
                         with gr.Column():
@@ -585,9 +1013,9 @@ class OllamaMCPApp:
                                 value=self.model_name
                             )
                             
-                            # すぐにモデル一覧を取得するコード
-                            app.load(
-                                fn=self.get_available_models,
+                            # モデル一覧は設定タブを開いたときに取得（一定時間キャッシュ）
+                            settings_tab.select(
+                                fn=self._maybe_load_models,
                                 inputs=None,
                                 outputs=model_dropdown
                             )
@@ -633,12 +1061,19 @@ class OllamaMCPApp:
             gr.Markdown("---")
             gr.Markdown("Ollama MCP Client & Agent - powered by Agno Framework")
         
+        # 長時間実行されるハンドラを並行処理できるようキューを設定（チャットは個別に1件ずつ）
+        app.queue(default_concurrency_limit=8, max_size=64)
+        
         return app
     
     def run(self, server_path: Optional[str] = None, port: int = 7860, share: bool = False) -> None:
         """
         アプリケーションを実行
         
+        並行リクエストを効率よく処理するには、Ollama側で環境変数
+        OLLAMA_NUM_PARALLEL（モデルあたりの同時処理数）と
+        OLLAMA_MAX_LOADED_MODELS（同時にロードするモデル数）を設定する
+        
         Args:
             server_path: MCPサーバーのパス（オプション）
             port: UIのポート番号
@@ -647,6 +1082,7 @@ class OllamaMCPApp:
         app = self.build_ui()
         
         # サーバーパスが指定されていれば自動接続
+        # （ページを開くたびに呼ばれるが、接続済みであれば既存のセッションをそのまま使う）
         if server_path:
             async def connect_on_start():
                 await self.connect_to_server(server_path)
@@ -654,7 +1090,7 @@ class OllamaMCPApp:
             app.load(fn=connect_on_start, inputs=None, outputs=None)
         
         # アプリケーションを起動
-        app.launch(server_port=port, share=share)
+        app.launch(server_port=port, share=share, show_error=True)
 
 def main():
     """
@@ -672,6 +1108,13 @@ def main():
     
     args = parser.parse_args()
     
+    # uvloopが利用可能であればイベントループとして使用
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     app = OllamaMCPApp(
         model_name=args.model,
         debug_level=args.debug,
@@ -1,6 +1,9 @@
 """
 Gradioを使用したチャットインターフェースの実装
 """
+import time
+from typing import AsyncIterator
+
 import gradio as gr
 from loguru import logger
 from agno.agent import Agent
@@ -36,28 +39,40 @@ class ChatUI:
             markdown=True
         )
         self.chat_history = []
+        # ストリーミング時にUIを更新する間隔（秒）
+        self.stream_interval = 0.03
         
-    def respond(self, message: str, history: list) -> str:
+    async def respond(self, message: str, history: list) -> AsyncIterator[str]:
         """
-        チャットメッセージに対する応答を生成
+        チャットメッセージに対する応答をストリーミングで生成
         
         Args:
             message (str): ユーザーからの入力メッセージ
             history (list): チャット履歴
             
-        Returns:
-            str: エージェントからの応答
+        Yields:
+            str: その時点までのエージェントからの応答
         """
         try:
             logger.info(f"Received message: {message}")
-            response = self.agent.run(message)
-            # RunResponseオブジェクトからcontentフィールドを取得
-            response_text = response.content
+            response_text = ""
+            last_yield = time.monotonic()
+            
+            # チャンクごとではなく一定間隔でまとめてUIを更新
+            async for chunk in await self.agent.arun(message, stream=True):
+                # RunResponseオブジェクトからcontentフィールドを取得
+                if isinstance(chunk.content, str):
+                    response_text += chunk.content
+                now = time.monotonic()
+                if now - last_yield >= self.stream_interval:
+                    last_yield = now
+                    yield response_text
+            
             logger.info(f"Generated response: {response_text}")
-            return response_text
+            yield response_text
         except Exception as e:
             logger.error(f"Error generating response: {e}")
-            return f"エラーが発生しました: {str(e)}"
+            yield f"エラーが発生しました: {str(e)}"
 
     def launch(self, **kwargs):
         """
@@ -70,7 +85,9 @@ class ChatUI:
             fn=self.respond,
             title="Agnoエージェントチャット",
             description="Ollamaを使用したローカルLLMエージェントとチャットできます",
-            theme="soft"
+            theme="soft",
+            # エージェントは全セッションで共有しているため、応答の生成は1件ずつ行う
+            concurrency_limit=1
         )
         demo.launch(**kwargs)
 
@@ -1,21 +1,114 @@
 """
 Agnoを使用したMCPサーバー向けデバッグとログユーティリティ
 """
-import json
+import atexit
 import time
 import logging
 import os
+import queue
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import islice
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Callable, Union
 import asyncio
 from datetime import datetime
 
+import orjson
+
+# コンソールの出力形式
+CONSOLE_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
 # ロギング設定
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format=CONSOLE_FORMAT
 )
 
+@dataclass(slots=True)
+class LogEntry:
+    """
+    メモリ内に保持するログエントリ
+    
+    __dict__ を持たないため、辞書で保持するよりもエントリあたりのメモリが小さい
+    """
+    timestamp: str
+    level: str
+    message: str
+    data: Dict[str, Any] = field(default_factory=dict)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書形式に変換"""
+        return {
+            "timestamp": self.timestamp,
+            "level": self.level,
+            "message": self.message,
+            "data": self.data
+        }
+
+# ログファイルの出力形式
+LOG_FORMAT = '%(levelname)s    %(name)s:%(filename)s:%(lineno)d %(message)s'
+
+# ロガー名ごとのファイル書き込みリスナー（ファイルI/Oをバックグラウンドスレッドで実行）
+_LOG_LISTENERS: Dict[str, QueueListener] = {}
+
+def _stop_log_listener(name: str) -> None:
+    """
+    リスナーを停止し、キューに残ったログを書き出してからハンドラを閉じる
+    
+    Args:
+        name: ロガー名
+    """
+    listener = _LOG_LISTENERS.pop(name, None)
+    if listener is None:
+        return
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+def _stop_all_log_listeners() -> None:
+    """すべてのリスナーを停止（終了時に未書き込みのログを失わないため）"""
+    for name in list(_LOG_LISTENERS):
+        _stop_log_listener(name)
+
+atexit.register(_stop_all_log_listeners)
+
+def _log_file_in_use(path: Path) -> bool:
+    """
+    他のデバッガーのリスナーが書き込み中のファイルかどうかを判定
+    
+    Args:
+        path: ログファイルのパス
+        
+    Returns:
+        書き込み中のファイルであればTrue
+    """
+    target = os.path.abspath(path)
+    return any(
+        getattr(handler, "baseFilename", None) == target
+        for listener in _LOG_LISTENERS.values()
+        for handler in listener.handlers
+    )
+
+def _shrink(value: Any, limit: int) -> Any:
+    """
+    表現が長すぎる値を切り詰めた文字列に置き換える
+    
+    Args:
+        value: 対象の値
+        limit: 許容する最大文字数
+        
+    Returns:
+        元の値、または切り詰めた repr 文字列
+    """
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        return value if len(value) <= limit else f"{value[:limit]}...<truncated>"
+    text = repr(value)
+    return value if len(text) <= limit else f"{text[:limit]}...<truncated>"
+
 class AgnoMCPDebugger:
     """
     Agno MCPデバッグユーティリティ
@@ -26,45 +119,75 @@ class AgnoMCPDebugger:
     - エラー診断
     - 会話履歴の保存と分析
     """
-    def __init__(self, level: str = "info", log_dir: str = "logs"):
+    # ログレベルの数値（標準loggingモジュールと同じ値）
+    _LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40, "critical": 50}
+    
+    def __init__(self, level: str = "info", log_dir: str = "logs", max_log_size: int = 1024 * 1024):
         """
         AgnoMCPDebuggerを初期化
         
         Args:
             level: ログレベル (debug, info, warning, error)
             log_dir: ログディレクトリのパス
+            max_log_size: ログファイルをローテーションするサイズ（バイト）
         """
         self.level = level
+        self._threshold = self._LEVELS.get(level.lower(), 20)
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(exist_ok=True)
         
         # ログファイルの設定
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.log_file = self.log_dir / f"agno_mcp_{timestamp}.log"
+        # 同じ秒に生成された別のデバッガーとファイルを共有しない（ローテーションが競合するため）
+        suffix = 1
+        while _log_file_in_use(self.log_file):
+            self.log_file = self.log_dir / f"agno_mcp_{timestamp}_{suffix}.log"
+            suffix += 1
+        
+        # ログファイルのサイズ制限（既定は1MB、超えた場合は .log.1 〜 .log.10 にローテーション）
+        self.max_log_size = max_log_size
+        self.log_backup_count = 10
         
         # ロギングの設定
-        logging.basicConfig(
-            level=getattr(logging, level.upper()),
-            format='%(levelname)s    %(name)s:%(filename)s:%(lineno)d %(message)s',
-            handlers=[
-                logging.FileHandler(self.log_file),
-                logging.StreamHandler()
-            ]
-        )
-        self.logger = logging.getLogger("agno-mcp")
+        # ルートロガーは設定済みのため basicConfig は効果がなく、渡したハンドラが
+        # 使われないまま生成されるだけになる。ロガーに直接レベルとハンドラを設定する
+        # ロガーはインスタンスごとに分け、別のデバッガーのハンドラやレベルを変更しない
+        self.logger = logging.getLogger(f"agno-mcp.{id(self)}")
+        self.logger.setLevel(getattr(logging, level.upper()))
+        self._set_file_handler(RotatingFileHandler(
+            self.log_file,
+            maxBytes=self.max_log_size,
+            backupCount=self.log_backup_count,
+            encoding='utf-8',
+            delay=True
+        ))
         
-        # メモリ内のログ管理
-        self.logs: List[Dict[str, Any]] = []
-        self.tool_calls: List[Dict[str, Any]] = []
-        self.errors: List[Dict[str, Any]] = []
+        # ログレベルごとの記録メソッド（呼び出しごとの属性検索を避ける）
+        self._log_methods: Dict[str, Callable[[str], None]] = {
+            "debug": self.logger.debug,
+            "info": self.logger.info,
+            "warning": self.logger.warning,
+            "error": self.logger.error,
+            "critical": self.logger.critical
+        }
         
         # メモリ制限
         self.max_logs = 100
         self.max_tool_calls = 50
         self.max_errors = 50
+        # ツールコールの引数・結果として保持する値の最大文字数
+        self.max_value_length = 4096
+        
+        # メモリ内のログ管理（上限を超えると古いものから自動的に破棄）
+        self.logs: deque[LogEntry] = deque(maxlen=self.max_logs)
+        self.tool_calls: deque[Dict[str, Any]] = deque(maxlen=self.max_tool_calls)
+        self.errors: deque[Dict[str, Any]] = deque(maxlen=self.max_errors)
         
-        # ログファイルのサイズ制限（1MB）
-        self.max_log_size = 1024 * 1024
+        
+        # タイムスタンプの秒単位部分のキャッシュ（ISO形式への変換を1秒に1回に抑える）
+        self._ts_sec = -1
+        self._ts_prefix = ""
         
         self.logger.info(f"Initialized AgnoMCPDebugger at level {level}")
     
@@ -77,24 +200,22 @@ class AgnoMCPDebugger:
             level: ログレベル
             data: 関連するデータ
         """
-        log_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "level": level,
-            "message": message,
-            "data": data or {}
-        }
+        # 設定レベル未満のログはエントリを作成せずに破棄
+        if self._LEVELS.get(level.lower(), 20) < self._threshold:
+            return
+        
+        log_entry = LogEntry(
+            timestamp=self._timestamp(),
+            level=level,
+            message=message,
+            data=data or {}
+        )
         
         # メモリ内のログを管理
         self.logs.append(log_entry)
-        if len(self.logs) > self.max_logs:
-            self.logs = self.logs[-self.max_logs:]
-        
-        # ログファイルのサイズをチェック
-        if self.log_file.exists() and self.log_file.stat().st_size > self.max_log_size:
-            self._rotate_log_file()
         
         # ログレベルに応じて記録
-        log_method = getattr(self.logger, level.lower(), self.logger.info)
+        log_method = self._log_methods.get(level.lower(), self.logger.info)
         log_method(message)
     
     def record_tool_call(self, tool: str, args: Dict, result: Any, duration: float) -> None:
@@ -108,16 +229,14 @@ class AgnoMCPDebugger:
             duration: 実行時間（秒）
         """
         tool_call = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self._timestamp(),
             "tool": tool,
-            "args": args,
-            "result": result,
+            "args": _shrink(args, self.max_value_length),
+            "result": _shrink(result, self.max_value_length),
             "duration": duration
         }
         
         self.tool_calls.append(tool_call)
-        if len(self.tool_calls) > self.max_tool_calls:
-            self.tool_calls = self.tool_calls[-self.max_tool_calls:]
         
         # ツールコールはログに記録しない
     
@@ -131,15 +250,13 @@ class AgnoMCPDebugger:
             details: 詳細情報
         """
         error_entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self._timestamp(),
             "type": error_type,
             "message": message,
             "details": details or {}
         }
         
         self.errors.append(error_entry)
-        if len(self.errors) > self.max_errors:
-            self.errors = self.errors[-self.max_errors:]
         
         # エラーはログに記録
         self.log(f"Error: {error_type} - {message}", "error")
@@ -154,7 +271,7 @@ class AgnoMCPDebugger:
         Returns:
             ログエントリのリスト
         """
-        return self.logs[-count:]
+        return [entry.to_dict() for entry in self._tail(self.logs, count)]
     
     def get_tool_calls(self, count: int = 10) -> List[Dict[str, Any]]:
         """
@@ -166,7 +283,7 @@ class AgnoMCPDebugger:
         Returns:
             ツールコールのリスト
         """
-        return self.tool_calls[-count:]
+        return list(self._tail(self.tool_calls, count))
     
     def get_errors(self, count: int = 10) -> List[Dict[str, Any]]:
         """
@@ -178,7 +295,7 @@ class AgnoMCPDebugger:
         Returns:
             エラーのリスト
         """
-        return self.errors[-count:]
+        return list(self._tail(self.errors, count))
     
     def export_logs(self, filepath: str) -> None:
         """
@@ -188,53 +305,107 @@ class AgnoMCPDebugger:
             filepath: エクスポート先のファイルパス
         """
         export_data = {
-            "logs": self.logs,
-            "tool_calls": self.tool_calls,
-            "errors": self.errors,
+            "logs": [entry.to_dict() for entry in self.logs],
+            "tool_calls": list(self.tool_calls),
+            "errors": list(self.errors),
             "exported_at": datetime.now().isoformat()
         }
         
-        with open(filepath, 'w') as f:
-            json.dump(export_data, f, indent=2)
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(
+                export_data,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY,
+                default=str
+            ))
     
     def clear_logs(self) -> None:
         """メモリ内ログをクリア"""
-        self.logs = []
+        self.logs.clear()
         self.log("Cleared memory logs", "info")
     
     def clear_tool_calls(self) -> None:
         """ツールコール履歴をクリア"""
-        self.tool_calls = []
+        self.tool_calls.clear()
         self.log("Cleared tool calls", "info")
     
     def clear_errors(self) -> None:
         """エラー履歴をクリア"""
-        self.errors = []
+        self.errors.clear()
         self.log("Cleared errors", "info")
     
-    def _rotate_log_file(self) -> None:
-        """ログファイルをローテーション"""
-        if not self.log_file.exists():
-            return
+    def _timestamp(self) -> str:
+        """
+        現在時刻のISO形式文字列を取得
+        
+        秒までの部分はキャッシュし、マイクロ秒のみを毎回付加する
+        
+        Returns:
+            ISO形式のタイムスタンプ
+        """
+        now = time.time()
+        sec = int(now)
+        if sec != self._ts_sec:
+            self._ts_sec = sec
+            self._ts_prefix = datetime.fromtimestamp(sec).isoformat()
+        return f"{self._ts_prefix}.{int((now - sec) * 1_000_000):06d}"
+    
+    @staticmethod
+    def _tail(items: deque, count: int) -> islice:
+        """
+        末尾から指定数の要素を順に返すイテレータを取得
+        
+        Args:
+            items: 対象のデック
+            count: 取得する要素数
             
-        # 既存のログファイルをバックアップ
-        backup_file = self.log_file.with_suffix(f".log.{datetime.now().strftime('%Y%m%d_%H%M%S')}")
-        self.log_file.rename(backup_file)
+        Returns:
+            末尾 count 件のイテレータ
+        """
+        return islice(items, max(0, len(items) - count), None)
+    
+    def _set_file_handler(self, file_handler: logging.FileHandler) -> None:
+        """
+        ロガーのファイルハンドラを置き換える
         
-        # 新しいログファイルを作成
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.log_file = self.log_dir / f"agno_mcp_{timestamp}.log"
+        ロガーにはキューへ積むだけの QueueHandler を設定し、ファイルとコンソールへの
+        書き込みは QueueListener のスレッドで行う（イベントループをI/Oで止めないため）。
+        コンソールへはリスナー経由で出力するため、ルートロガーへは伝播させない
         
-        # ロギングハンドラを更新
+        Args:
+            file_handler: 新しいファイルハンドラ
+        """
         for handler in self.logger.handlers[:]:
-            if isinstance(handler, logging.FileHandler):
+            if isinstance(handler, (QueueHandler, logging.FileHandler)):
                 self.logger.removeHandler(handler)
+                handler.close()
+        _stop_log_listener(self.logger.name)
         
-        file_handler = logging.FileHandler(self.log_file)
-        file_handler.setFormatter(logging.Formatter('%(levelname)s    %(name)s:%(filename)s:%(lineno)d %(message)s'))
-        self.logger.addHandler(file_handler)
-        
-        self.log("Rotated log file", "info")
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        log_queue: queue.Queue = queue.Queue(-1)
+        listener = QueueListener(log_queue, file_handler, stream_handler)
+        listener.start()
+        _LOG_LISTENERS[self.logger.name] = listener
+        self.logger.addHandler(QueueHandler(log_queue))
+        self.logger.propagate = False
+    
+    def flush(self) -> None:
+        """キューに積まれたログがファイルへ書き込まれるまで待機"""
+        listener = _LOG_LISTENERS.get(self.logger.name)
+        if listener is None:
+            return
+        listener.queue.join()
+        for handler in listener.handlers:
+            handler.flush()
+    
+    def close(self) -> None:
+        """ファイルへの書き込みを完了し、ハンドラを閉じる"""
+        for handler in self.logger.handlers[:]:
+            if isinstance(handler, QueueHandler):
+                self.logger.removeHandler(handler)
+                handler.close()
+        _stop_log_listener(self.logger.name)
 
 class ToolCallTracer:
     """
@@ -8,21 +8,27 @@ MCPサーバー情報とメトリクスの可視化モジュール
 - パフォーマンスメトリクスの視覚化
 """
 import asyncio
+import bisect
+import concurrent.futures
+import functools
+import heapq
+import statistics
 import time
+from collections import Counter, defaultdict, deque
+from operator import itemgetter
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Union, Tuple
+from typing import Callable, Dict, List, Any, Optional, Union, Tuple
 import json
 import logging
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import matplotlib
 matplotlib.use('Agg')  # GUIが不要なバックエンドを使用
-import io
-import base64
-from PIL import Image
+from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 
 import gradio as gr
 
@@ -59,15 +65,42 @@ class MCPServerVisualizer:
             "last_used": {}   # ツールごとの最終使用時刻
         }
         
+        # ツールごとの累積カウンタ（新しいツールコールだけを取り込んで更新する）
+        self._tool_counters: Dict[str, Dict[str, Any]] = defaultdict(
+            lambda: {"n": 0, "mean_dur": 0.0, "succ": 0, "last_used": ""}
+        )
+        self._last_seen_ts = ""
+        self._recent_durations: deque = deque(maxlen=20)
+        self._last_error_ts = ""
+        # 直近1時間のエラー発生時刻（昇順、エラー率の計算用）
+        self._error_times = np.empty(0, dtype="datetime64[ns]")
+        
         # エラー統計の保存
         self.error_stats = {
-            "count": {},      # エラータイプごとの発生回数
-            "timeline": [],   # 時系列でのエラー発生
-            "sources": {}     # エラーの発生源
+            "count": Counter(),    # エラータイプごとの発生回数
+            "timeline": [],        # 時系列でのエラー発生
+            "sources": Counter()   # エラーの発生源
         }
         
-        # パフォーマンス情報
-        self.performance_history = []
+        # パフォーマンス情報（直近10分間のツールコール時刻）
+        self.performance_history: deque = deque(maxlen=600)
+        
+        # 実行中のメトリクス更新（同時に来た要求で共有する）
+        self._metrics_inflight: Optional[asyncio.Task] = None
+        
+        # チャートごとの最新の図（統計が変わらない間はそのまま返す）
+        self._figs: Dict[str, Figure] = {}
+        
+        # 統計の版数（統計が変わったときだけ統計由来のチャートを描き直す）
+        self._stats_version = 0
+        self._chart_versions: Dict[str, int] = {}
+        
+        # チャート生成用のスレッドプール（イベントループをブロックせず、6つのチャートを同時に生成する）
+        self._chart_pool = concurrent.futures.ThreadPoolExecutor(max_workers=6, thread_name_prefix="mcp-chart")
+        # 実行中のチャート生成（同時に来た要求で共有する）
+        self._charts_inflight: Optional[asyncio.Task] = None
+        # チャート生成中のイベントループ（ワーカースレッドのエラーをループ上で記録するため）
+        self._chart_loop: Optional[asyncio.AbstractEventLoop] = None
         
         self.debugger.log("MCPServerVisualizer initialized", "info")
     
@@ -84,19 +117,45 @@ class MCPServerVisualizer:
         if (now - self.last_update).total_seconds() < self.update_interval and self.metrics_cache:
             return self.metrics_cache
         
+        task = self._metrics_inflight
+        if task is None:
+            task = self._metrics_inflight = asyncio.create_task(self._refresh_metrics(now))
+            task.add_done_callback(lambda _: setattr(self, '_metrics_inflight', None))
+        # 待機中の1セッションがキャンセルされても共有の更新処理は止めない
+        return await asyncio.shield(task)
+    
+    async def _refresh_metrics(self, now: datetime) -> Dict[str, Any]:
+        """
+        メトリクスを収集してキャッシュを更新
+        
+        Args:
+            now: 更新時刻
+            
+        Returns:
+            更新されたメトリクス
+        """
         try:
             # メトリクスの収集
             self.last_update = now
             
+            # デバッガーからのデータ取得は1回の更新につき1度だけ行う
+            tool_calls = self.debugger.get_tool_calls(100)
+            errors = self.debugger.get_errors(50)
+            logs = self.debugger.get_recent_logs(100)
+            
             # ツール使用統計の更新
-            await self.update_tool_stats()
+            await self.update_tool_stats(tool_calls)
             
             # エラー統計の更新
-            await self.update_error_stats()
+            await self.update_error_stats(errors)
+            
+            # パフォーマンス情報の収集（10分より古いツールコールは破棄）
+            ten_minutes_ago = (now - timedelta(minutes=10)).isoformat()
+            while self.performance_history and self.performance_history[0] < ten_minutes_ago:
+                self.performance_history.popleft()
             
-            # パフォーマンス情報の収集
             response_times = self._calculate_response_times()
-            error_rate = self._calculate_error_rate()
+            error_rate = self._calculate_error_rate(logs)
             
             # メトリクスをまとめる
             metrics = {
@@ -122,69 +181,65 @@ class MCPServerVisualizer:
             # エラーが発生した場合も前回のキャッシュを返す
             return self.metrics_cache or {"error": str(e)}
     
-    async def update_tool_stats(self) -> None:
-        """ツール使用統計を更新"""
+    async def update_tool_stats(self, tool_calls: Optional[List[Dict[str, Any]]] = None) -> None:
+        """
+        ツール使用統計を更新
+        
+        Args:
+            tool_calls: 集計するツールコール（省略時はデバッガーから最大100件を取得）
+        """
         try:
             # 最近のツールコールを取得（最大100件）
-            tool_calls = self.debugger.get_tool_calls(100)
+            if tool_calls is None:
+                tool_calls = self.debugger.get_tool_calls(100)
             
             if not tool_calls:
                 return
             
-            # ツールごとの統計を計算
-            calls = {}
-            durations = {}
-            success = {}
-            last_used = {}
-            
-            for call in tool_calls:
-                tool_name = call.get("tool", "unknown")
-                timestamp = call.get("timestamp", "")
-                duration = call.get("duration", 0)
-                result = call.get("result", None)
-                
-                # 呼び出し回数
-                if tool_name in calls:
-                    calls[tool_name] += 1
-                else:
-                    calls[tool_name] = 1
-                
-                # 実行時間
-                if tool_name in durations:
-                    durations[tool_name].append(duration)
-                else:
-                    durations[tool_name] = [duration]
-                
-                # 成功したかどうか（結果がエラーを含まなければ成功と見なす）
-                is_success = True
-                if isinstance(result, str) and ("error" in result.lower() or "exception" in result.lower()):
-                    is_success = False
-                
-                if tool_name in success:
-                    success[tool_name]["total"] += 1
-                    if is_success:
-                        success[tool_name]["success"] += 1
-                else:
-                    success[tool_name] = {"total": 1, "success": 1 if is_success else 0}
-                
-                # 最終使用時刻
-                last_used[tool_name] = timestamp
+            # 前回取り込んだ以降のツールコールだけを集計対象にする
+            new_calls = [call for call in tool_calls if call.get("timestamp", "") > self._last_seen_ts]
+            
+            if not new_calls:
+                return
+            
+            # 新しいツールコールを pandas でまとめて集計
+            df = pd.DataFrame(new_calls, columns=["tool", "timestamp", "duration", "result"])
+            df["tool"] = df["tool"].fillna("unknown")
+            df["duration"] = df["duration"].fillna(0)
+            
+            # 成功したかどうか（文字列の結果がエラーを含まなければ成功と見なす）
+            df["is_success"] = ~df["result"].astype(object).str.contains(
+                "error|exception", case=False, regex=True, na=False
+            )
             
-            # 平均実行時間を計算
-            avg_durations = {}
-            for tool_name, times in durations.items():
-                avg_durations[tool_name] = sum(times) / len(times)
+            batch = df.groupby("tool", sort=False).agg(
+                n=("duration", "size"),
+                mean_dur=("duration", "mean"),
+                succ=("is_success", "sum"),
+                last_used=("timestamp", "max")
+            )
             
-            # 成功率を計算
-            success_rates = {}
-            for tool_name, stats in success.items():
-                success_rates[tool_name] = (stats["success"] / stats["total"]) * 100 if stats["total"] > 0 else 0
+            # 累積カウンタに反映（平均は件数で重み付けして逐次更新）
+            for tool_name, n, mean_dur, succ, last_used in batch.itertuples(name=None):
+                counter = self._tool_counters[tool_name]
+                counter["n"] += int(n)
+                counter["mean_dur"] += (mean_dur - counter["mean_dur"]) * n / counter["n"]
+                counter["succ"] += int(succ)
+                counter["last_used"] = last_used
             
-            # 統計を更新
-            self.tool_stats["calls"] = calls
-            self.tool_stats["duration"] = avg_durations
-            self.tool_stats["success"] = success_rates
-            self.tool_stats["last_used"] = last_used
+            self._recent_durations.extend(df["duration"].tolist())
+            self.performance_history.extend(sorted(df["timestamp"]))
+            self._last_seen_ts = df["timestamp"].max()
+            
+            # 統計を更新（チャート生成中のスレッドが参照している辞書は変更せず差し替える）
+            counters = self._tool_counters
+            self.tool_stats = {
+                "calls": {name: c["n"] for name, c in counters.items()},
+                "duration": {name: float(c["mean_dur"]) for name, c in counters.items()},
+                "success": {name: c["succ"] / c["n"] * 100 for name, c in counters.items()},
+                "last_used": {name: c["last_used"] for name, c in counters.items()}
+            }
+            self._stats_version += 1
             
         except Exception as e:
             self.debugger.record_error(
@@ -192,50 +247,57 @@ class MCPServerVisualizer:
                 f"Error updating tool statistics: {str(e)}"
             )
     
-    async def update_error_stats(self) -> None:
-        """エラー統計を更新"""
+    async def update_error_stats(self, errors: Optional[List[Dict[str, Any]]] = None) -> None:
+        """
+        エラー統計を更新
+        
+        Args:
+            errors: 集計するエラー（省略時はデバッガーから最大50件を取得）
+        """
         try:
             # エラーログを取得（最大50件）
-            errors = self.debugger.get_errors(50)
+            if errors is None:
+                errors = self.debugger.get_errors(50)
             
             if not errors:
                 return
             
+            # 前回取り込んだ以降のエラーだけを集計対象にする
+            new_errors = [error for error in errors if error.get("timestamp", "") > self._last_error_ts]
+            
+            if not new_errors:
+                return
+            
             # エラータイプごとの集計
-            error_counts = {}
-            error_timeline = []
-            error_sources = {}
-            
-            for error in errors:
-                error_type = error.get("type", "unknown")
-                timestamp = error.get("timestamp", "")
-                message = error.get("message", "")
-                details = error.get("details", {})
-                
-                # エラー数を集計
-                if error_type in error_counts:
-                    error_counts[error_type] += 1
-                else:
-                    error_counts[error_type] = 1
-                
-                # タイムライン用のデータ
-                if timestamp:
-                    error_timeline.append({
-                        "timestamp": timestamp,
-                        "type": error_type
-                    })
-                
-                # エラー発生源（ツール名など）
-                source = details.get("tool", "unknown")
-                if source in error_sources:
-                    error_sources[source] += 1
-                else:
-                    error_sources[source] = 1
+            df = pd.DataFrame(new_errors, columns=["type", "timestamp", "details"])
+            df["type"] = df["type"].fillna("unknown")
+            
+            # チャート生成中のスレッドが参照している統計は変更せず、コピーを更新して差し替える
+            count = self.error_stats["count"].copy()
+            count.update(df["type"].tolist())
+            
+            # タイムライン用のデータ（常にタイムスタンプ順を保つ）
+            timeline = list(self.error_stats["timeline"])
+            for event in df[["timestamp", "type"]].to_dict("records"):
+                bisect.insort_right(timeline, event, key=lambda x: x["timestamp"])
+            
+            # 24時間より古いイベントはチャートに使わないので破棄
+            cutoff = (datetime.now() - timedelta(hours=24)).isoformat()
+            del timeline[:bisect.bisect_left(timeline, cutoff, key=lambda x: x["timestamp"])]
             
-            # 統計を更新
-            self.error_stats["count"] = error_counts
-            self.error_stats["timeline"] = sorted(error_timeline, key=lambda x: x["timestamp"])
-            self.error_stats["sources"] = error_sources
+            # エラー率の計算用に発生時刻を保持（1時間より古いものは破棄）
+            error_times = pd.to_datetime(df["timestamp"], format="ISO8601", errors="coerce", cache=True).dropna().to_numpy()
+            hour_ago = np.datetime64(datetime.now() - timedelta(hours=1))
+            kept = self._error_times[np.searchsorted(self._error_times, hour_ago):]
+            self._error_times = np.sort(np.concatenate([kept, error_times]))
+            
+            # エラー発生源（ツール名など）
+            sources = self.error_stats["sources"].copy()
+            sources.update(df["details"].astype(object).str.get("tool").fillna("unknown").tolist())
+            
+            self.error_stats = {"count": count, "timeline": timeline, "sources": sources}
+            self._last_error_ts = df["timestamp"].max()
+            self._stats_version += 1
             
         except Exception as e:
             self.debugger.record_error(
@@ -245,47 +307,163 @@ class MCPServerVisualizer:
     
     def _calculate_response_times(self) -> Dict[str, float]:
         """応答時間の統計を計算"""
-        # 最近の応答時間のデータを取得
-        tool_calls = self.debugger.get_tool_calls(20)
-        
-        if not tool_calls:
+        # update_tool_stats で取り込んだ直近の応答時間を使用
+        if not self._recent_durations:
             return {"avg": 0, "min": 0, "max": 0, "p95": 0}
         
-        # 応答時間のリストを作成
-        durations = [call.get("duration", 0) for call in tool_calls]
+        # 応答時間の配列を作成
+        durations = np.fromiter(
+            self._recent_durations,
+            dtype=np.float64,
+            count=len(self._recent_durations)
+        )
         
         # 統計値を計算
         return {
-            "avg": sum(durations) / len(durations) if durations else 0,
-            "min": min(durations) if durations else 0,
-            "max": max(durations) if durations else 0,
-            "p95": sorted(durations)[int(len(durations) * 0.95)] if len(durations) >= 20 else max(durations) if durations else 0
+            "avg": float(durations.mean()),
+            "min": float(durations.min()),
+            "max": float(durations.max()),
+            "p95": float(np.percentile(durations, 95))
         }
     
-    def _calculate_error_rate(self) -> float:
-        """エラー率を計算"""
-        # 最近のログ数と最近のエラー数を取得
-        logs = self.debugger.get_recent_logs(100)
-        errors = self.debugger.get_errors(50)
+    def _calculate_error_rate(self, logs: List[Dict[str, Any]]) -> float:
+        """
+        エラー率を計算
         
+        Args:
+            logs: 最近のログ
+            
+        Returns:
+            エラー率（%）
+        """
         if not logs:
             return 0.0
         
-        # 最近のエラー（過去1時間以内）をカウント
-        recent_errors = 0
-        one_hour_ago = (datetime.now() - timedelta(hours=1)).isoformat()
-        
-        for error in errors:
-            if error.get("timestamp", "") >= one_hour_ago:
-                recent_errors += 1
+        # 最近のエラー（過去1時間以内）をカウント（発生時刻は昇順なので二分探索で求める）
+        one_hour_ago = np.datetime64(datetime.now() - timedelta(hours=1))
+        recent_errors = self._error_times.size - int(np.searchsorted(self._error_times, one_hour_ago))
         
         # エラー率を計算（最大100%）
         return min(100.0, (recent_errors / len(logs)) * 100)
     
-    def generate_server_status_chart(self) -> gr.Plot:
+    async def generate_all_charts(self) -> Tuple[Figure, ...]:
+        """
+        ダッシュボードの全チャートをスレッドプールで並行して生成
+        
+        生成は同時に1回だけ行い、生成中に来た要求は同じ結果を待つ
+        
+        Returns:
+            ツール使用状況、サーバー状態、エラー傾向、パフォーマンス、エラー分布、ツール成功率のMatplotlib図
+        """
+        task = self._charts_inflight
+        if task is None:
+            task = self._charts_inflight = asyncio.create_task(self._render_all_charts())
+            task.add_done_callback(lambda _: setattr(self, '_charts_inflight', None))
+        # 待機中の1セッションがキャンセルされても共有の生成処理は止めない
+        return await asyncio.shield(task)
+    
+    async def _render_all_charts(self) -> Tuple[Figure, ...]:
+        """
+        全チャートをスレッドプールで生成
+        
+        デバッガーのデックはイベントループ上で追記されるため、ワーカースレッドからは
+        読まず、ログとツールコールのスナップショットをここで取得して渡す
+        """
+        loop = asyncio.get_running_loop()
+        logs = self.debugger.get_recent_logs(100)
+        tool_calls = self.debugger.get_tool_calls(50)
+        chart_fns = [
+            self.generate_tool_usage_chart,
+            functools.partial(self.generate_server_status_chart, logs),
+            self.generate_error_trend_chart,
+            functools.partial(self.generate_performance_chart, tool_calls),
+            self.generate_error_distribution_chart,
+            self.generate_tool_success_chart
+        ]
+        self._chart_loop = loop
+        try:
+            return tuple(await asyncio.gather(
+                *(loop.run_in_executor(self._chart_pool, fn) for fn in chart_fns)
+            ))
+        finally:
+            self._chart_loop = None
+    
+    def _record_chart_error(self, message: str) -> None:
+        """
+        チャート生成エラーを記録
+        
+        ワーカースレッドからはデバッガーに直接触れず、イベントループ上で記録する
+        
+        Args:
+            message: エラーメッセージ
+        """
+        loop = self._chart_loop
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if loop is not None and running is not loop:
+            loop.call_soon_threadsafe(self.debugger.record_error, "chart_generation_error", message)
+        else:
+            self.debugger.record_error("chart_generation_error", message)
+    
+    def _is_chart_current(self, name: str) -> bool:
+        """
+        チャートが現在の統計で描画済みかどうかを判定
+        
+        Args:
+            name: チャート名
+            
+        Returns:
+            描画済みの図をそのまま返せる場合は True
+        """
+        return name in self._figs and self._chart_versions.get(name) == self._stats_version
+    
+    def _error_fig(self, name: str, message: str) -> Figure:
+        """
+        エラーメッセージを表示する図を取得
+        
+        Args:
+            name: チャート名
+            message: 表示するエラーメッセージ
+            
+        Returns:
+            Matplotlib図
+        """
+        fig, ax = self._get_figure(name, (8, 4))
+        ax.text(0.5, 0.5, message, 
+                horizontalalignment='center', verticalalignment='center', 
+                transform=ax.transAxes, color='red')
+        ax.set_xticks([])
+        ax.set_yticks([])
+        return fig
+    
+    def _get_figure(self, name: str, figsize: Tuple[float, float]) -> Tuple[Figure, Axes]:
+        """
+        チャート用の新しい図と軸を取得
+        
+        返した図は描画後に変更しないため、前回返した図を表示側が画像に変換している
+        間に、ワーカースレッドが同じ図をクリアして描き直すことはない
+        
+        Args:
+            name: チャート名
+            figsize: 図のサイズ
+            
+        Returns:
+            図と軸のタプル
+        """
+        # pyplot を介さずに生成する（ワーカースレッドから pyplot のグローバル状態に触れない）
+        fig = self._figs[name] = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        return fig, fig.add_subplot()
+    
+    def generate_server_status_chart(self, logs: Optional[List[Dict[str, Any]]] = None) -> gr.Plot:
         """
         サーバー状態のチャートを生成
         
+        Args:
+            logs: 接続状態を抽出するログ（省略時はデバッガーから最大100件を取得）
+            
         Returns:
             Matplotlib図
         """
@@ -295,7 +473,8 @@ class MCPServerVisualizer:
             statuses = []
             
             # ログから接続状態の履歴を抽出
-            logs = self.debugger.get_recent_logs(100)
+            if logs is None:
+                logs = self.debugger.get_recent_logs(100)
             
             for log in logs:
                 msg = log.get("message", "")
@@ -308,15 +487,20 @@ class MCPServerVisualizer:
                     timestamps.append(timestamp)
                     statuses.append(0)  # 接続エラー
             
+            # 日時文字列をdatetimeに変換（解釈できないタイムスタンプは除外）
+            status_series = pd.Series(
+                statuses,
+                index=pd.to_datetime(timestamps, format="ISO8601", errors="coerce", cache=True),
+                dtype=np.int64
+            )
+            status_series = status_series[status_series.index.notna()]
+            
             # チャートの作成
-            fig, ax = plt.subplots(figsize=(10, 4))
+            fig, ax = self._get_figure("server_status", (10, 4))
             
-            if timestamps and statuses:
-                # 日時文字列をdatetimeオブジェクトに変換
-                dt_timestamps = [datetime.fromisoformat(ts) for ts in timestamps]
-                
+            if not status_series.empty:
                 # プロット
-                ax.plot(dt_timestamps, statuses, 'o-', color='blue')
+                ax.plot(status_series.index, status_series.to_numpy(), 'o-', color='blue')
                 ax.set_yticks([0, 1])
                 ax.set_yticklabels(['切断', '接続中'])
                 ax.set_xlabel('時間')
@@ -334,19 +518,9 @@ class MCPServerVisualizer:
             
             return fig
         except Exception as e:
-            self.debugger.record_error(
-                "chart_generation_error",
-                f"Error generating server status chart: {str(e)}"
-            )
+            self._record_chart_error(f"Error generating server status chart: {str(e)}")
             
-            # エラー表示用の図を作成
-            fig, ax = plt.subplots(figsize=(8, 4))
-            ax.text(0.5, 0.5, f'チャート生成エラー: {str(e)}', 
-                    horizontalalignment='center', verticalalignment='center', 
-                    transform=ax.transAxes, color='red')
-            ax.set_xticks([])
-            ax.set_yticks([])
-            return fig
+            return self._error_fig("server_status", f'チャート生成エラー: {str(e)}')
     
     def generate_tool_usage_chart(self) -> gr.Plot:
         """
@@ -356,27 +530,28 @@ class MCPServerVisualizer:
             Matplotlib図
         """
         try:
+            # 統計が前回の描画から変わっていなければ同じ図を返す
+            if self._is_chart_current("tool_usage"):
+                return self._figs["tool_usage"]
+            
+            # 描画に使う統計を読む前の版数を記録する（描画中に統計が更新されたら次回描き直す）
+            version = self._stats_version
+            
             # ツール呼び出し回数のデータを使用
             calls = self.tool_stats.get("calls", {})
             
             # チャートの作成
-            fig, ax = plt.subplots(figsize=(10, 5))
+            fig, ax = self._get_figure("tool_usage", (10, 5))
             
             if calls:
-                # ツール名と呼び出し回数の取得
-                tools = list(calls.keys())
-                counts = list(calls.values())
-                
-                # 呼び出し回数に基づいてソート
-                sorted_data = sorted(zip(tools, counts), key=lambda x: x[1], reverse=True)
-                tools = [x[0] for x in sorted_data]
-                counts = [x[1] for x in sorted_data]
-                
-                # 最大10個のツールに制限
-                if len(tools) > 10:
-                    tools = tools[:10]
-                    counts = counts[:10]
-                    tools[-1] = "その他"  # 最後のツールを「その他」に変更
+                # 呼び出し回数の多い順に最大10個のツールに制限（超過分は「その他」にまとめる）
+                if len(calls) > 10:
+                    top = heapq.nlargest(9, calls.items(), key=itemgetter(1))
+                    top.append(("その他", sum(calls.values()) - sum(count for _, count in top)))
+                else:
+                    top = sorted(calls.items(), key=itemgetter(1), reverse=True)
+                tools = [tool for tool, _ in top]
+                counts = [count for _, count in top]
                 
                 # 水平バーチャートの作成
                 y_pos = np.arange(len(tools))
@@ -397,21 +572,12 @@ class MCPServerVisualizer:
                 ax.set_xticks([])
                 ax.set_yticks([])
             
+            self._chart_versions["tool_usage"] = version
             return fig
         except Exception as e:
-            self.debugger.record_error(
-                "chart_generation_error",
-                f"Error generating tool usage chart: {str(e)}"
-            )
+            self._record_chart_error(f"Error generating tool usage chart: {str(e)}")
             
-            # エラー表示用の図を作成
-            fig, ax = plt.subplots(figsize=(8, 4))
-            ax.text(0.5, 0.5, f'チャート生成エラー: {str(e)}', 
-                    horizontalalignment='center', verticalalignment='center', 
-                    transform=ax.transAxes, color='red')
-            ax.set_xticks([])
-            ax.set_yticks([])
-            return fig
+            return self._error_fig("tool_usage", f'チャート生成エラー: {str(e)}')
     
     def generate_error_trend_chart(self) -> gr.Plot:
         """
@@ -425,36 +591,23 @@ class MCPServerVisualizer:
             timeline = self.error_stats.get("timeline", [])
             
             # チャートの作成
-            fig, ax = plt.subplots(figsize=(10, 4))
+            fig, ax = self._get_figure("error_trend", (10, 4))
             
             if timeline:
-                # タイムスタンプを時間単位でグループ化
-                timestamps = [datetime.fromisoformat(item["timestamp"]) for item in timeline]
-                error_types = [item["type"] for item in timeline]
+                # 最近24時間のエラーに限定（タイムラインはタイムスタンプ順）
+                cutoff = (datetime.now() - timedelta(hours=24)).isoformat()
+                start = bisect.bisect_left(timeline, cutoff, key=lambda x: x["timestamp"])
                 
-                # 最近24時間のエラーに限定
-                now = datetime.now()
-                recent_data = [(ts, et) for ts, et in zip(timestamps, error_types) 
-                              if (now - ts).total_seconds() <= 24 * 3600]
+                # タイムスタンプを datetime に変換
+                recent = pd.DataFrame(timeline[start:], columns=["timestamp", "type"])
+                recent["timestamp"] = pd.to_datetime(recent["timestamp"], format="ISO8601", errors="coerce", cache=True)
+                recent = recent.dropna(subset=["timestamp"]).set_index("timestamp")
                 
-                if recent_data:
-                    timestamps, error_types = zip(*recent_data)
-                else:
-                    timestamps, error_types = [], []
-                
-                if timestamps and error_types:
+                if not recent.empty:
                     # 時間ごとにエラーをカウント
-                    hour_counts = {}
-                    for ts, et in zip(timestamps, error_types):
-                        hour_key = ts.replace(minute=0, second=0, microsecond=0)
-                        if hour_key in hour_counts:
-                            hour_counts[hour_key] += 1
-                        else:
-                            hour_counts[hour_key] = 1
-                    
-                    # プロット用のデータを作成
-                    x = sorted(hour_counts.keys())
-                    y = [hour_counts[k] for k in x]
+                    hour_counts = recent.resample("1h").size()
+                    x = hour_counts.index
+                    y = hour_counts.to_numpy()
                     
                     # プロット
                     ax.plot(x, y, 'o-', color='red')
@@ -480,50 +633,39 @@ class MCPServerVisualizer:
             
             return fig
         except Exception as e:
-            self.debugger.record_error(
-                "chart_generation_error",
-                f"Error generating error trend chart: {str(e)}"
-            )
+            self._record_chart_error(f"Error generating error trend chart: {str(e)}")
             
-            # エラー表示用の図を作成
-            fig, ax = plt.subplots(figsize=(8, 4))
-            ax.text(0.5, 0.5, f'チャート生成エラー: {str(e)}', 
-                    horizontalalignment='center', verticalalignment='center', 
-                    transform=ax.transAxes, color='red')
-            ax.set_xticks([])
-            ax.set_yticks([])
-            return fig
+            return self._error_fig("error_trend", f'チャート生成エラー: {str(e)}')
     
-    def generate_performance_chart(self) -> gr.Plot:
+    def generate_performance_chart(self, tool_calls: Optional[List[Dict[str, Any]]] = None) -> gr.Plot:
         """
         パフォーマンスチャートを生成
         
+        Args:
+            tool_calls: 実行時間を表示するツールコール（省略時はデバッガーから最大50件を取得）
+            
         Returns:
             Matplotlib図
         """
         try:
             # ツールコールの実行時間データ
-            tool_calls = self.debugger.get_tool_calls(50)
+            if tool_calls is None:
+                tool_calls = self.debugger.get_tool_calls(50)
             
             # チャートの作成
-            fig, ax = plt.subplots(figsize=(10, 4))
+            fig, ax = self._get_figure("performance", (10, 4))
             
             if tool_calls:
-                # タイムスタンプと実行時間を抽出
-                timestamps = []
-                durations = []
+                # タイムスタンプと実行時間を抽出（解釈できないタイムスタンプや空文字列は除外）
+                df = pd.DataFrame(tool_calls, columns=["timestamp", "duration"])
+                df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601", errors="coerce", cache=True)
+                df = df.dropna()
                 
-                for call in tool_calls:
-                    timestamp = call.get("timestamp", "")
-                    duration = call.get("duration", 0)
+                if not df.empty:
+                    timestamps = pd.DatetimeIndex(df["timestamp"])
                     
-                    if timestamp and duration is not None:
-                        timestamps.append(datetime.fromisoformat(timestamp))
-                        durations.append(duration)
-                
-                if timestamps and durations:
                     # 実行時間をミリ秒に変換
-                    durations_ms = [d * 1000 for d in durations]
+                    durations_ms = df["duration"].to_numpy(dtype=np.float64) * 1000
                     
                     # プロット
                     ax.plot(timestamps, durations_ms, 'o-', color='green')
@@ -535,10 +677,7 @@ class MCPServerVisualizer:
                     # 移動平均を追加
                     if len(durations_ms) >= 5:
                         window_size = min(5, len(durations_ms))
-                        moving_avg = []
-                        for i in range(len(durations_ms) - window_size + 1):
-                            window = durations_ms[i:i+window_size]
-                            moving_avg.append(sum(window) / window_size)
+                        moving_avg = np.convolve(durations_ms, np.ones(window_size) / window_size, mode='valid')
                         
                         moving_avg_times = timestamps[window_size-1:]
                         ax.plot(moving_avg_times, moving_avg, 'r--', linewidth=2, label='5ポイント移動平均')
@@ -561,19 +700,9 @@ class MCPServerVisualizer:
             
             return fig
         except Exception as e:
-            self.debugger.record_error(
-                "chart_generation_error",
-                f"Error generating performance chart: {str(e)}"
-            )
+            self._record_chart_error(f"Error generating performance chart: {str(e)}")
             
-            # エラー表示用の図を作成
-            fig, ax = plt.subplots(figsize=(8, 4))
-            ax.text(0.5, 0.5, f'チャート生成エラー: {str(e)}', 
-                    horizontalalignment='center', verticalalignment='center', 
-                    transform=ax.transAxes, color='red')
-            ax.set_xticks([])
-            ax.set_yticks([])
-            return fig
+            return self._error_fig("performance", f'チャート生成エラー: {str(e)}')
     
     def generate_error_distribution_chart(self) -> gr.Plot:
         """
@@ -583,27 +712,28 @@ class MCPServerVisualizer:
             Matplotlib図
         """
         try:
+            # 統計が前回の描画から変わっていなければ同じ図を返す
+            if self._is_chart_current("error_distribution"):
+                return self._figs["error_distribution"]
+            
+            # 描画に使う統計を読む前の版数を記録する（描画中に統計が更新されたら次回描き直す）
+            version = self._stats_version
+            
             # エラータイプごとの発生回数
             error_counts = self.error_stats.get("count", {})
             
             # チャートの作成
-            fig, ax = plt.subplots(figsize=(10, 5))
+            fig, ax = self._get_figure("error_distribution", (10, 5))
             
             if error_counts:
-                # エラータイプと発生回数の取得
-                error_types = list(error_counts.keys())
-                counts = list(error_counts.values())
-                
-                # 発生回数に基づいてソート
-                sorted_data = sorted(zip(error_types, counts), key=lambda x: x[1], reverse=True)
-                error_types = [x[0] for x in sorted_data]
-                counts = [x[1] for x in sorted_data]
-                
-                # 最大8個のエラータイプに制限
-                if len(error_types) > 8:
-                    others_count = sum(counts[7:])
-                    error_types = error_types[:7] + ["その他"]
-                    counts = counts[:7] + [others_count]
+                # 発生回数の多い順に最大8個のエラータイプに制限（超過分は「その他」にまとめる）
+                if len(error_counts) > 8:
+                    top = heapq.nlargest(7, error_counts.items(), key=itemgetter(1))
+                    top.append(("その他", sum(error_counts.values()) - sum(count for _, count in top)))
+                else:
+                    top = sorted(error_counts.items(), key=itemgetter(1), reverse=True)
+                error_types = [error_type for error_type, _ in top]
+                counts = [count for _, count in top]
                 
                 # 円グラフの作成
                 ax.pie(counts, labels=error_types, autopct='%1.1f%%', startangle=90)
@@ -616,21 +746,12 @@ class MCPServerVisualizer:
                 ax.set_xticks([])
                 ax.set_yticks([])
             
+            self._chart_versions["error_distribution"] = version
             return fig
         except Exception as e:
-            self.debugger.record_error(
-                "chart_generation_error",
-                f"Error generating error distribution chart: {str(e)}"
-            )
+            self._record_chart_error(f"Error generating error distribution chart: {str(e)}")
             
-            # エラー表示用の図を作成
-            fig, ax = plt.subplots(figsize=(8, 4))
-            ax.text(0.5, 0.5, f'チャート生成エラー: {str(e)}', 
-                    horizontalalignment='center', verticalalignment='center', 
-                    transform=ax.transAxes, color='red')
-            ax.set_xticks([])
-            ax.set_yticks([])
-            return fig
+            return self._error_fig("error_distribution", f'チャート生成エラー: {str(e)}')
     
     def generate_tool_success_chart(self) -> gr.Plot:
         """
@@ -640,26 +761,24 @@ class MCPServerVisualizer:
             Matplotlib図
         """
         try:
+            # 統計が前回の描画から変わっていなければ同じ図を返す
+            if self._is_chart_current("tool_success"):
+                return self._figs["tool_success"]
+            
+            # 描画に使う統計を読む前の版数を記録する（描画中に統計が更新されたら次回描き直す）
+            version = self._stats_version
+            
             # ツールごとの成功率データ
             success_rates = self.tool_stats.get("success", {})
             
             # チャートの作成
-            fig, ax = plt.subplots(figsize=(10, 5))
+            fig, ax = self._get_figure("tool_success", (10, 5))
             
             if success_rates:
-                # ツール名と成功率の取得
-                tools = list(success_rates.keys())
-                rates = list(success_rates.values())
-                
-                # 成功率に基づいてソート
-                sorted_data = sorted(zip(tools, rates), key=lambda x: x[1])
-                tools = [x[0] for x in sorted_data]
-                rates = [x[1] for x in sorted_data]
-                
-                # 最大10個のツールに制限
-                if len(tools) > 10:
-                    tools = tools[-10:]  # 上位10個を表示
-                    rates = rates[-10:]
+                # 成功率の低い順に最大10個のツールに制限（問題のあるツールを優先して表示）
+                worst = heapq.nsmallest(10, success_rates.items(), key=itemgetter(1))
+                tools = [tool for tool, _ in worst]
+                rates = [rate for _, rate in worst]
                 
                 # 水平バーチャートの作成
                 y_pos = np.arange(len(tools))
@@ -684,454 +803,531 @@ class MCPServerVisualizer:
                 ax.set_xticks([])
                 ax.set_yticks([])
             
+            self._chart_versions["tool_success"] = version
             return fig
         except Exception as e:
-            self.debugger.record_error(
-                "chart_generation_error",
-                f"Error generating tool success chart: {str(e)}"
-            )
+            self._record_chart_error(f"Error generating tool success chart: {str(e)}")
             
-            # エラー表示用の図を作成
-# エラー表示用の図を作成
-           fig, ax = plt.subplots(figsize=(8, 4))
-           ax.text(0.5, 0.5, f'チャート生成エラー: {str(e)}', 
-                   horizontalalignment='center', verticalalignment='center', 
-                   transform=ax.transAxes, color='red')
-           ax.set_xticks([])
-           ax.set_yticks([])
-           return fig
+            return self._error_fig("tool_success", f'チャート生成エラー: {str(e)}')
    
-   def get_metrics_summary(self) -> Dict[str, Any]:
-       """
-       メトリクスの要約を取得
-       
-       Returns:
-           メトリクスのサマリー情報
-       """
-       # ツール使用統計
-       tool_calls = self.debugger.get_tool_calls(100)
+    def get_metrics_summary(self) -> Dict[str, Any]:
+        """
+        メトリクスの要約を取得
        
-       # エラー統計
-       errors = self.debugger.get_errors(50)
+        Returns:
+            メトリクスのサマリー情報
+        """
+        # 集計済みの統計から要約する（デバッガーを再取得しない）
+        calls = self.tool_stats.get("calls", {})
+        durations = self.tool_stats.get("duration", {})
+        success_rates = self.tool_stats.get("success", {})
+        most_common_error = self.error_stats["count"].most_common(1)
+        most_common_source = self.error_stats["sources"].most_common(1)
        
-       # 要約情報を作成
-       summary = {
-           "timestamp": datetime.now().isoformat(),
-           "tool_metrics": {
-               "total_calls": len(tool_calls),
-               "unique_tools": len(self.tool_stats.get("calls", {})),
-               "avg_duration_ms": sum(self.tool_stats.get("duration", {}).values()) / len(self.tool_stats.get("duration", {})) * 1000 if self.tool_stats.get("duration", {}) else 0,
-               "avg_success_rate": sum(self.tool_stats.get("success", {}).values()) / len(self.tool_stats.get("success", {})) if self.tool_stats.get("success", {}) else 0
-           },
-           "error_metrics": {
-               "total_errors": len(errors),
-               "unique_error_types": len(self.error_stats.get("count", {})),
-               "most_common_error": max(self.error_stats.get("count", {}).items(), key=lambda x: x[1])[0] if self.error_stats.get("count", {}) else "N/A",
-               "most_common_source": max(self.error_stats.get("sources", {}).items(), key=lambda x: x[1])[0] if self.error_stats.get("sources", {}) else "N/A"
-           }
-       }
+        # 要約情報を作成
+        summary = {
+            "timestamp": datetime.now().isoformat(),
+            "tool_metrics": {
+                "total_calls": sum(calls.values()),
+                "unique_tools": len(calls),
+                "avg_duration_ms": statistics.fmean(durations.values()) * 1000 if durations else 0,
+                "avg_success_rate": statistics.fmean(success_rates.values()) if success_rates else 0
+            },
+            "error_metrics": {
+                "total_errors": self.error_stats["count"].total(),
+                "unique_error_types": len(self.error_stats.get("count", {})),
+                "most_common_error": most_common_error[0][0] if most_common_error else "N/A",
+                "most_common_source": most_common_source[0][0] if most_common_source else "N/A"
+            }
+        }
        
-       return summary
+        return summary
    
-   def get_tool_details_table(self) -> List[List[str]]:
-       """
-       ツール詳細テーブルデータを取得
+    def get_tool_details_table(self) -> List[List[str]]:
+        """
+        ツール詳細テーブルデータを取得
        
-       Returns:
-           ツール詳細のテーブルデータ
-       """
-       try:
-           # ツール統計データ
-           calls = self.tool_stats.get("calls", {})
-           durations = self.tool_stats.get("duration", {})
-           success_rates = self.tool_stats.get("success", {})
-           last_used = self.tool_stats.get("last_used", {})
+        Returns:
+            ツール詳細のテーブルデータ
+        """
+        try:
+            # ツール統計データ
+            calls = self.tool_stats.get("calls", {})
+            durations = self.tool_stats.get("duration", {})
+            success_rates = self.tool_stats.get("success", {})
+            last_used = self.tool_stats.get("last_used", {})
            
-           # テーブルのヘッダー行
-           table = [["ツール名", "呼び出し回数", "平均実行時間(ms)", "成功率(%)", "最終使用時刻"]]
+            # タイムスタンプを読みやすい形式にまとめて変換（変換できない場合は元のまま）
+            last_used = pd.Series(last_used, dtype=object)
+            last_used = pd.to_datetime(last_used, format="ISO8601", errors="coerce", cache=True).dt.strftime("%Y-%m-%d %H:%M:%S").fillna(last_used)
            
-           # ツールごとの詳細
-           for tool_name in calls.keys():
-               call_count = calls.get(tool_name, 0)
-               duration = durations.get(tool_name, 0) * 1000  # 秒をミリ秒に変換
-               success_rate = success_rates.get(tool_name, 0)
-               last_used_time = last_used.get(tool_name, "")
-               
-               # タイムスタンプを読みやすい形式に変換
-               if last_used_time:
-                   try:
-                       dt = datetime.fromisoformat(last_used_time)
-                       last_used_time = dt.strftime("%Y-%m-%d %H:%M:%S")
-                   except Exception:
-                       pass  # 変換できない場合は元のまま
+            # テーブルのヘッダー行
+            table = [["ツール名", "呼び出し回数", "平均実行時間(ms)", "成功率(%)", "最終使用時刻"]]
+           
+            # ツールごとの詳細
+            for tool_name in calls.keys():
+                call_count = calls.get(tool_name, 0)
+                duration = durations.get(tool_name, 0) * 1000  # 秒をミリ秒に変換
+                success_rate = success_rates.get(tool_name, 0)
+                last_used_time = last_used.get(tool_name, "")
                
-               # 行の追加
-               table.append([
-                   tool_name,
-                   str(call_count),
-                   f"{duration:.2f}",
-                   f"{success_rate:.1f}",
-                   last_used_time
-               ])
+                # 行の追加
+                table.append([
+                    tool_name,
+                    str(call_count),
+                    f"{duration:.2f}",
+                    f"{success_rate:.1f}",
+                    last_used_time
+                ])
            
-           return table
-       except Exception as e:
-           self.debugger.record_error(
-               "table_generation_error",
-               f"Error generating tool details table: {str(e)}"
-           )
-           return [["Error generating table", str(e)]]
+            return table
+        except Exception as e:
+            self.debugger.record_error(
+                "table_generation_error",
+                f"Error generating tool details table: {str(e)}"
+            )
+            return [["Error generating table", str(e)]]
    
-   def get_error_details_table(self) -> List[List[str]]:
-       """
-       エラー詳細テーブルデータを取得
+    def get_error_details_table(self) -> List[List[str]]:
+        """
+        エラー詳細テーブルデータを取得
        
-       Returns:
-           エラー詳細のテーブルデータ
-       """
-       try:
-           # 最近のエラーを取得
-           errors = self.debugger.get_errors(20)
+        Returns:
+            エラー詳細のテーブルデータ
+        """
+        try:
+            # 最近のエラーを取得
+            errors = self.debugger.get_errors(20)
            
-           # テーブルのヘッダー行
-           table = [["タイムスタンプ", "エラータイプ", "メッセージ", "発生源"]]
+            # テーブルのヘッダー行
+            header = ["タイムスタンプ", "エラータイプ", "メッセージ", "発生源"]
            
-           # エラーごとの詳細
-           for error in errors:
-               timestamp = error.get("timestamp", "")
-               error_type = error.get("type", "unknown")
-               message = error.get("message", "")
-               details = error.get("details", {})
-               source = details.get("tool", "unknown") if isinstance(details, dict) else "unknown"
-               
-               # タイムスタンプを読みやすい形式に変換
-               if timestamp:
-                   try:
-                       dt = datetime.fromisoformat(timestamp)
-                       timestamp = dt.strftime("%Y-%m-%d %H:%M:%S")
-                   except Exception:
-                       pass  # 変換できない場合は元のまま
-               
-               # メッセージが長すぎる場合は省略
-               if len(message) > 100:
-                   message = message[:97] + "..."
-               
-               # 行の追加
-               table.append([
-                   timestamp,
-                   error_type,
-                   message,
-                   source
-               ])
+            if not errors:
+                return [header]
+           
+            df = pd.DataFrame(errors, columns=["timestamp", "type", "message", "details"])
+            df["type"] = df["type"].fillna("unknown")
+            df["message"] = df["message"].fillna("").astype(str)
+           
+            # タイムスタンプを読みやすい形式に変換（変換できない場合は元のまま）
+            df["timestamp"] = df["timestamp"].fillna("")
+            df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601", errors="coerce", cache=True).dt.strftime("%Y-%m-%d %H:%M:%S").fillna(df["timestamp"])
+           
+            # メッセージが長すぎる場合は省略
+            long = df["message"].str.len() > 100
+            df.loc[long, "message"] = df.loc[long, "message"].str.slice(0, 97) + "..."
+           
+            # エラー発生源（ツール名など）
+            df["details"] = df["details"].astype(object).str.get("tool").fillna("unknown")
            
-           return table
-       except Exception as e:
-           self.debugger.record_error(
-               "table_generation_error",
-               f"Error generating error details table: {str(e)}"
-           )
-           return [["Error generating table", str(e)]]
+            return [header] + df.values.tolist()
+        except Exception as e:
+            self.debugger.record_error(
+                "table_generation_error",
+                f"Error generating error details table: {str(e)}"
+            )
+            return [["Error generating table", str(e)]]
 
 class MCPVisualizer:
-   """
-   MCPサーバー可視化コンポーネントの管理クラス
+    """
+    MCPサーバー可視化コンポーネントの管理クラス
    
-   主な責務:
-   - 可視化モジュールのライフサイクル管理
-   - Gradio UIコンポーネントの構築
-   - 定期的なデータ更新
-   """
-   def __init__(self, debugger: AgnoMCPDebugger):
-       """
-       MCPVisualizer を初期化
+    主な責務:
+    - 可視化モジュールのライフサイクル管理
+    - Gradio UIコンポーネントの構築
+    - 定期的なデータ更新
+    """
+    def __init__(self, debugger: AgnoMCPDebugger):
+        """
+        MCPVisualizer を初期化
        
-       Args:
-           debugger: AgnoMCPDebugger インスタンス
-       """
-       self.debugger = debugger
-       self.server_visualizer = MCPServerVisualizer(debugger)
-       self.update_interval = 10  # 秒
-       self.last_metrics_update = time.time()
+        Args:
+            debugger: AgnoMCPDebugger インスタンス
+        """
+        self.debugger = debugger
+        self.server_visualizer = MCPServerVisualizer(debugger)
+        self.update_interval = 10  # 秒
+        # 初回のタブ表示では必ずメトリクスを取得する
+        self.last_metrics_update = 0.0
+        
+        # 生成済みのチャートとテーブルのキャッシュ（名前 -> (生成時刻, メトリクス版数, 値)）
+        self._chart_cache: Dict[str, Tuple[float, int, Any]] = {}
+        self._metrics_version = 0
+        
+        # タブ表示時に更新するコンポーネント（各ダッシュボードの構築時に設定）
+        self._chart_outputs: List[gr.Plot] = []
+        self._details_outputs: List[gr.components.Component] = []
+        self._dashboard_timer: Optional[gr.Timer] = None
+        self._auto_update: Optional[gr.Checkbox] = None
+        
+        # 詳細情報タブの表示内容と生成関数
+        self._detail_sources: Dict[str, Callable[[], Any]] = {
+            "tool_details": self.server_visualizer.get_tool_details_table,
+            "error_details": self.server_visualizer.get_error_details_table,
+            "metrics_summary": self.server_visualizer.get_metrics_summary
+        }
        
-       self.debugger.log("MCPVisualizer initialized", "info")
+        self.debugger.log("MCPVisualizer initialized", "info")
    
-   def build_metrics_dashboard(self) -> gr.Blocks:
-       """
-       メトリクスダッシュボードUI構築
+    def build_metrics_dashboard(self) -> gr.Blocks:
+        """
+        メトリクスダッシュボードUI構築
        
-       Returns:
-           Gradio Blocks コンポーネント
-       """
-       with gr.Blocks() as dashboard:
-           gr.Markdown("# MCP サーバーメトリクスダッシュボード")
+        Returns:
+            Gradio Blocks コンポーネント
+        """
+        with gr.Blocks() as dashboard:
+            gr.Markdown("# MCP サーバーメトリクスダッシュボード")
            
-           with gr.Row():
-               with gr.Column():
-                   gr.Markdown("## ツール使用統計")
-                   tool_chart = gr.Plot(value=self.server_visualizer.generate_tool_usage_chart())
+            with gr.Row():
+                with gr.Column():
+                    gr.Markdown("## ツール使用統計")
+                    tool_chart = gr.Plot(value=None)
                
-               with gr.Column():
-                   gr.Markdown("## サーバー状態")
-                   server_chart = gr.Plot(value=self.server_visualizer.generate_server_status_chart())
+                with gr.Column():
+                    gr.Markdown("## サーバー状態")
+                    server_chart = gr.Plot(value=None)
            
-           with gr.Row():
-               with gr.Column():
-                   gr.Markdown("## エラー傾向")
-                   error_chart = gr.Plot(value=self.server_visualizer.generate_error_trend_chart())
+            with gr.Row():
+                with gr.Column():
+                    gr.Markdown("## エラー傾向")
+                    error_chart = gr.Plot(value=None)
                
-               with gr.Column():
-                   gr.Markdown("## パフォーマンス指標")
-                   perf_chart = gr.Plot(value=self.server_visualizer.generate_performance_chart())
+                with gr.Column():
+                    gr.Markdown("## パフォーマンス指標")
+                    perf_chart = gr.Plot(value=None)
            
-           with gr.Row():
-               with gr.Column():
-                   gr.Markdown("## エラー分布")
-                   error_dist_chart = gr.Plot(value=self.server_visualizer.generate_error_distribution_chart())
+            with gr.Row():
+                with gr.Column():
+                    gr.Markdown("## エラー分布")
+                    error_dist_chart = gr.Plot(value=None)
                
-               with gr.Column():
-                   gr.Markdown("## ツール成功率")
-                   success_chart = gr.Plot(value=self.server_visualizer.generate_tool_success_chart())
-           
-           refresh_btn = gr.Button("更新")
+                with gr.Column():
+                    gr.Markdown("## ツール成功率")
+                    success_chart = gr.Plot(value=None)
            
-           # 自動更新間隔の設定
-           update_interval = gr.Slider(
-               minimum=5,
-               maximum=60,
-               value=self.update_interval,
-               step=5,
-               label="自動更新間隔（秒）"
-           )
+            refresh_btn = gr.Button("更新")
            
-           # 自動更新切り替え
-           auto_update = gr.Checkbox(
-               label="自動更新を有効化",
-               value=True
-           )
-           
-           # 更新ボタンのクリックイベント
-           refresh_btn.click(
-               fn=self.update_dashboard,
-               inputs=[],
-               outputs=[
-                   tool_chart, server_chart, error_chart, 
-                   perf_chart, error_dist_chart, success_chart
-               ]
-           )
-           
-           # 自動更新間隔変更イベント
-           update_interval.change(
-               fn=lambda interval: self.set_update_interval(interval),
-               inputs=[update_interval],
-               outputs=[]
-           )
-           
-           # 自動更新の設定
-           def setup_auto_update():
-               tool_chart.every(
-                   self.update_interval,
-                   self.server_visualizer.generate_tool_usage_chart,
-                   inputs=None,
-                   outputs=tool_chart,
-                   show_progress=False
-               )
-               server_chart.every(
-                   self.update_interval,
-                   self.server_visualizer.generate_server_status_chart,
-                   inputs=None,
-                   outputs=server_chart,
-                   show_progress=False
-               )
-               error_chart.every(
-                   self.update_interval,
-                   self.server_visualizer.generate_error_trend_chart,
-                   inputs=None,
-                   outputs=error_chart,
-                   show_progress=False
-               )
-               perf_chart.every(
-                   self.update_interval,
-                   self.server_visualizer.generate_performance_chart,
-                   inputs=None,
-                   outputs=perf_chart,
-                   show_progress=False
-               )
-               error_dist_chart.every(
-                   self.update_interval,
-                   self.server_visualizer.generate_error_distribution_chart,
-                   inputs=None,
-                   outputs=error_dist_chart,
-                   show_progress=False
-               )
-               success_chart.every(
-                   self.update_interval,
-                   self.server_visualizer.generate_tool_success_chart,
-                   inputs=None,
-                   outputs=success_chart,
-                   show_progress=False
-               )
+            # 自動更新間隔の設定
+            update_interval = gr.Slider(
+                minimum=5,
+                maximum=60,
+                value=self.update_interval,
+                step=5,
+                label="自動更新間隔（秒）"
+            )
            
-           # 自動更新トグルイベント
-           auto_update.change(
-               fn=lambda value: self.toggle_auto_update(value, setup_auto_update),
-               inputs=[auto_update],
-               outputs=[]
-           )
+            # 自動更新切り替え
+            auto_update = gr.Checkbox(
+                label="自動更新を有効化",
+                value=True
+            )
            
-           # 初期セットアップ
-           if auto_update.value:
-               setup_auto_update()
-       
-       return dashboard
+            # 全チャートをまとめて更新するタイマー（チャートごとにポーリングしない）
+            # タブが表示されるまでは動かさない（表示時に show_dashboard で有効化する）
+            timer = self._dashboard_timer = gr.Timer(self.update_interval, active=False)
+            self._auto_update = auto_update
+            chart_outputs = self._chart_outputs = [
+                tool_chart, server_chart, error_chart,
+                perf_chart, error_dist_chart, success_chart
+            ]
+            
+            # 更新ボタンのクリックイベント
+            refresh_btn.click(
+                fn=self.update_dashboard,
+                inputs=[],
+                outputs=chart_outputs
+            )
+            
+            # 自動更新
+            timer.tick(
+                fn=self.update_dashboard,
+                inputs=None,
+                outputs=chart_outputs,
+                show_progress="hidden"
+            )
+            
+            # 自動更新間隔変更イベント
+            update_interval.change(
+                fn=self.set_update_interval,
+                inputs=[update_interval],
+                outputs=[timer]
+            )
+            
+            # 自動更新トグルイベント
+            auto_update.change(
+                fn=self.toggle_auto_update,
+                inputs=[auto_update],
+                outputs=[timer]
+            )
+        
+        return dashboard
    
-   def build_details_dashboard(self) -> gr.Blocks:
-       """
-       詳細ダッシュボードUI構築
+    def build_details_dashboard(self) -> gr.Blocks:
+        """
+        詳細ダッシュボードUI構築
        
-       Returns:
-           Gradio Blocks コンポーネント
-       """
-       with gr.Blocks() as details:
-           gr.Markdown("# MCP サーバー詳細情報")
+        Returns:
+            Gradio Blocks コンポーネント
+        """
+        with gr.Blocks() as details:
+            gr.Markdown("# MCP サーバー詳細情報")
            
-           with gr.Tabs():
-               with gr.Tab("ツール詳細"):
-                   tool_details_table = gr.Dataframe(
-                       value=self.server_visualizer.get_tool_details_table(),
-                       headers=["ツール名", "呼び出し回数", "平均実行時間(ms)", "成功率(%)", "最終使用時刻"],
-                       datatype=["str", "str", "str", "str", "str"],
-                       col_count=(5, "fixed")
-                   )
+            with gr.Tabs():
+                with gr.Tab("ツール詳細"):
+                    tool_details_table = gr.Dataframe(
+                        value=None,
+                        headers=["ツール名", "呼び出し回数", "平均実行時間(ms)", "成功率(%)", "最終使用時刻"],
+                        datatype=["str", "str", "str", "str", "str"],
+                        col_count=(5, "fixed")
+                    )
                    
-                   tool_details_refresh = gr.Button("更新")
+                    tool_details_refresh = gr.Button("更新")
                    
-                   tool_details_refresh.click(
-                       fn=self.server_visualizer.get_tool_details_table,
-                       inputs=[],
-                       outputs=[tool_details_table]
-                   )
+                    tool_details_refresh.click(
+                        fn=functools.partial(self.refresh_detail, "tool_details"),
+                        inputs=[],
+                        outputs=[tool_details_table]
+                    )
                
-               with gr.Tab("エラー詳細"):
-                   error_details_table = gr.Dataframe(
-                       value=self.server_visualizer.get_error_details_table(),
-                       headers=["タイムスタンプ", "エラータイプ", "メッセージ", "発生源"],
-                       datatype=["str", "str", "str", "str"],
-                       col_count=(4, "fixed")
-                   )
+                with gr.Tab("エラー詳細"):
+                    error_details_table = gr.Dataframe(
+                        value=None,
+                        headers=["タイムスタンプ", "エラータイプ", "メッセージ", "発生源"],
+                        datatype=["str", "str", "str", "str"],
+                        col_count=(4, "fixed")
+                    )
                    
-                   error_details_refresh = gr.Button("更新")
+                    error_details_refresh = gr.Button("更新")
                    
-                   error_details_refresh.click(
-                       fn=self.server_visualizer.get_error_details_table,
-                       inputs=[],
-                       outputs=[error_details_table]
-                   )
+                    error_details_refresh.click(
+                        fn=functools.partial(self.refresh_detail, "error_details"),
+                        inputs=[],
+                        outputs=[error_details_table]
+                    )
                
-               with gr.Tab("メトリクスサマリー"):
-                   metrics_summary = gr.JSON(value=self.server_visualizer.get_metrics_summary())
+                with gr.Tab("メトリクスサマリー"):
+                    metrics_summary = gr.JSON(value=None)
                    
-                   metrics_summary_refresh = gr.Button("更新")
+                    metrics_summary_refresh = gr.Button("更新")
                    
-                   metrics_summary_refresh.click(
-                       fn=self.server_visualizer.get_metrics_summary,
-                       inputs=[],
-                       outputs=[metrics_summary]
-                   )
+                    metrics_summary_refresh.click(
+                        fn=functools.partial(self.refresh_detail, "metrics_summary"),
+                        inputs=[],
+                        outputs=[metrics_summary]
+                    )
        
-       return details
+            self._details_outputs = [tool_details_table, error_details_table, metrics_summary]
+        
+        return details
    
-   async def update_metrics(self) -> Dict[str, Any]:
-       """
-       メトリクスの更新
+    async def update_metrics(self) -> Dict[str, Any]:
+        """
+        メトリクスの更新
        
-       Returns:
-           更新されたメトリクス
-       """
-       return await self.server_visualizer.update_metrics()
+        Returns:
+            更新されたメトリクス
+        """
+        metrics = await self.server_visualizer.update_metrics()
+        self._metrics_version += 1
+        return metrics
+    
+    async def _update_metrics_if_due(self) -> None:
+        """更新間隔を過ぎていればメトリクスを更新（同時に来た要求では1回だけ更新する）"""
+        current_time = time.time()
+        if current_time - self.last_metrics_update >= self.update_interval:
+            # 待機中に来た要求が重ねて更新しないよう、先に更新時刻を記録する
+            self.last_metrics_update = current_time
+            await self.update_metrics()
+    
+    def _cache_get(self, name: str) -> Optional[Any]:
+        """
+        キャッシュ済みの値を取得
+        
+        更新間隔を過ぎたもの、またはメトリクス更新前に生成されたものは無効とする
+        
+        Args:
+            name: キャッシュ名
+            
+        Returns:
+            有効なキャッシュがあればその値、なければ None
+        """
+        entry = self._chart_cache.get(name)
+        if entry is None:
+            return None
+        created_at, version, value = entry
+        if time.time() - created_at >= self.update_interval or version != self._metrics_version:
+            return None
+        return value
+    
+    def _cache_put(self, name: str, value: Any) -> Any:
+        """
+        値をキャッシュに保存
+        
+        Args:
+            name: キャッシュ名
+            value: 保存する値
+            
+        Returns:
+            保存した値
+        """
+        self._chart_cache[name] = (time.time(), self._metrics_version, value)
+        return value
+    
+    def _cached(self, name: str, fn: Callable[[], Any]) -> Any:
+        """
+        キャッシュが有効ならその値を、無効なら fn() の結果を保存して返す
+        
+        Args:
+            name: キャッシュ名
+            fn: 値を生成する関数
+            
+        Returns:
+            キャッシュ済みまたは新たに生成した値
+        """
+        value = self._cache_get(name)
+        if value is None:
+            value = self._cache_put(name, fn())
+        return value
    
-   def update_dashboard(self) -> Tuple[gr.Plot, gr.Plot, gr.Plot, gr.Plot, gr.Plot, gr.Plot]:
-       """
-       ダッシュボードを更新
+    async def update_dashboard(self) -> Tuple[gr.Plot, gr.Plot, gr.Plot, gr.Plot, gr.Plot, gr.Plot]:
+        """
+        ダッシュボードを更新
        
-       Returns:
-           更新されたチャートのタプル
-       """
-       try:
-           # メトリクスの更新（非同期ではないバージョン）
-           current_time = time.time()
-           if current_time - self.last_metrics_update >= self.update_interval:
-               # この部分は非同期なので、実際にはイベントループで実行する必要がある
-               # しかし、Gradioの関数は同期的なので、実際のメトリクス更新は
-               # チャート生成時に内部で行われる
-               self.last_metrics_update = current_time
-           
-           # 各チャートを生成
-           tool_chart = self.server_visualizer.generate_tool_usage_chart()
-           server_chart = self.server_visualizer.generate_server_status_chart()
-           error_chart = self.server_visualizer.generate_error_trend_chart()
-           perf_chart = self.server_visualizer.generate_performance_chart()
-           error_dist_chart = self.server_visualizer.generate_error_distribution_chart()
-           success_chart = self.server_visualizer.generate_tool_success_chart()
+        Returns:
+            更新されたチャートのタプル
+        """
+        try:
+            # メトリクスの更新
+            await self._update_metrics_if_due()
            
-           return tool_chart, server_chart, error_chart, perf_chart, error_dist_chart, success_chart
-       except Exception as e:
-           self.debugger.record_error(
-               "dashboard_update_error",
-               f"Error updating dashboard: {str(e)}"
-           )
+            # メトリクスが変わっておらず更新間隔内であれば前回のチャートを返す
+            # （生成中に来た要求は generate_all_charts で同じ生成結果を待つ）
+            charts = self._cache_get("dashboard")
+            if charts is None:
+                # 各チャートをスレッドプールで生成
+                charts = self._cache_put("dashboard", await self.server_visualizer.generate_all_charts())
+            return charts
+        except Exception as e:
+            self.debugger.record_error(
+                "dashboard_update_error",
+                f"Error updating dashboard: {str(e)}"
+            )
            
-           # エラー発生時は空のプロットを返す
-           error_fig, ax = plt.subplots(figsize=(8, 4))
-           ax.text(0.5, 0.5, f'ダッシュボード更新エラー: {str(e)}', 
-                   horizontalalignment='center', verticalalignment='center', 
-                   transform=ax.transAxes, color='red')
-           ax.set_xticks([])
-           ax.set_yticks([])
+            # エラー発生時は空のプロットを返す
+            error_fig = Figure(figsize=(8, 4))
+            FigureCanvasAgg(error_fig)
+            ax = error_fig.add_subplot()
+            ax.text(0.5, 0.5, f'ダッシュボード更新エラー: {str(e)}', 
+                    horizontalalignment='center', verticalalignment='center', 
+                    transform=ax.transAxes, color='red')
+            ax.set_xticks([])
+            ax.set_yticks([])
            
-           # すべてのチャートに同じエラーメッセージを表示
-           return error_fig, error_fig, error_fig, error_fig, error_fig, error_fig
+            # すべてのチャートに同じエラーメッセージを表示
+            return error_fig, error_fig, error_fig, error_fig, error_fig, error_fig
    
-   def set_update_interval(self, interval: float) -> None:
-       """
-       自動更新間隔を設定
+    async def update_details(self) -> Tuple[List[List[str]], List[List[str]], Dict[str, Any]]:
+        """
+        詳細情報タブのテーブルを更新
+        
+        Returns:
+            ツール詳細テーブル、エラー詳細テーブル、メトリクスサマリーのタプル
+        """
+        await self._update_metrics_if_due()
+        return tuple(self._cached(name, fn) for name, fn in self._detail_sources.items())
+    
+    async def refresh_detail(self, name: str) -> Any:
+        """
+        詳細情報タブの項目を1つ更新
+        
+        Args:
+            name: 項目名（tool_details, error_details, metrics_summary）
+            
+        Returns:
+            更新されたテーブルまたはサマリー
+        """
+        await self._update_metrics_if_due()
+        return self._cached(name, self._detail_sources[name])
+    
+    def set_update_interval(self, interval: float) -> Dict[str, Any]:
+        """
+        自動更新間隔を設定
        
-       Args:
-           interval: 更新間隔（秒）
-       """
-       self.update_interval = interval
-       self.debugger.log(f"Update interval set to {interval} seconds", "info")
+        Args:
+            interval: 更新間隔（秒）
+            
+        Returns:
+            自動更新タイマーの更新内容
+        """
+        self.update_interval = interval
+        self._chart_cache.clear()
+        self.debugger.log(f"Update interval set to {interval} seconds", "info")
+        return gr.update(value=interval)
    
-   def toggle_auto_update(self, enabled: bool, setup_fn: callable) -> None:
-       """
-       自動更新を切り替え
+    def toggle_auto_update(self, enabled: bool) -> Dict[str, Any]:
+        """
+        自動更新を切り替え
        
-       Args:
-           enabled: 有効化するかどうか
-           setup_fn: 自動更新設定関数
-       """
-       if enabled:
-           setup_fn()
-           self.debugger.log("Auto update enabled", "info")
-       else:
-           # 実際のGradioアプリでは自動更新を無効化するコードが必要
-           self.debugger.log("Auto update disabled", "info")
+        Args:
+            enabled: 有効化するかどうか
+            
+        Returns:
+            自動更新タイマーの更新内容
+        """
+        self.debugger.log(f"Auto update {'enabled' if enabled else 'disabled'}", "info")
+        return gr.update(active=enabled)
+    
+    async def show_dashboard(self, auto_update: bool) -> Tuple[Any, ...]:
+        """
+        メトリクスダッシュボードのタブが表示されたときにチャートを更新し、自動更新を再開
+        
+        Args:
+            auto_update: 自動更新が有効かどうか
+            
+        Returns:
+            更新されたチャートと自動更新タイマーの更新内容のタプル
+        """
+        return (*await self.update_dashboard(), gr.update(active=auto_update))
+    
+    async def show_details(self) -> Tuple[Any, ...]:
+        """
+        詳細情報のタブが表示されたときにテーブルを更新し、ダッシュボードの自動更新を止める
+        
+        Returns:
+            更新されたテーブルと自動更新タイマーの更新内容のタプル
+        """
+        return (*await self.update_details(), gr.update(active=False))
    
-   def build_visualization_tab(self) -> gr.Tab:
-       """
-       可視化タブを構築
+    def build_visualization_tab(self) -> gr.Tab:
+        """
+        可視化タブを構築
        
-       Returns:
-           Gradio Tab コンポーネント
-       """
-       with gr.Tab("可視化") as tab:
-           with gr.Tabs():
-               with gr.Tab("メトリクスダッシュボード"):
-                   dashboard = self.build_metrics_dashboard()
+        Returns:
+            Gradio Tab コンポーネント
+        """
+        with gr.Tab("可視化") as tab:
+            with gr.Tabs():
+                with gr.Tab("メトリクスダッシュボード") as dashboard_tab:
+                    dashboard = self.build_metrics_dashboard()
                
-               with gr.Tab("詳細情報"):
-                   details = self.build_details_dashboard()
+                with gr.Tab("詳細情報") as details_tab:
+                    details = self.build_details_dashboard()
+            
+            # チャートとテーブルは構築時ではなくタブが表示されたときに生成する
+            # （自動更新はダッシュボードが表示されている間だけ動かす）
+            dashboard_tab.select(
+                fn=self.show_dashboard,
+                inputs=[self._auto_update],
+                outputs=[*self._chart_outputs, self._dashboard_timer]
+            )
+            details_tab.select(
+                fn=self.show_details,
+                inputs=None,
+                outputs=[*self._details_outputs, self._dashboard_timer]
+            )
        
-       return tab
+        return tab
    
    
 # ollama_mcp/visualizer.py に追加
@@ -2,8 +2,9 @@ import pytest
 import os
 import json
 import asyncio
+from collections import deque
 from pathlib import Path
-from ollama_mcp.debug_module import AgnoMCPDebugger
+from ollama_mcp.debug_module import AgnoMCPDebugger, LogEntry
 
 @pytest.fixture
 def debugger():
@@ -34,9 +35,12 @@ def test_debugger_initialization(debugger):
     assert debugger.level == "info"
     assert os.path.exists("logs")
     assert debugger.log_file is not None
-    assert isinstance(debugger.logs, list)
-    assert isinstance(debugger.tool_calls, list)
-    assert isinstance(debugger.errors, list)
+    assert isinstance(debugger.logs, deque)
+    assert debugger.logs.maxlen == debugger.max_logs
+    assert isinstance(debugger.tool_calls, deque)
+    assert debugger.tool_calls.maxlen == debugger.max_tool_calls
+    assert isinstance(debugger.errors, deque)
+    assert debugger.errors.maxlen == debugger.max_errors
 
 def test_log_levels(debugger):
     """各ログレベルのテスト"""
@@ -47,12 +51,40 @@ def test_log_levels(debugger):
         debugger.log(test_message, level)
     
     logs = debugger.get_recent_logs()
-    assert len(logs) >= 4  # 他のテストでもログが記録される可能性があるため
+    assert len(logs) >= 3  # 他のテストでもログが記録される可能性があるため
     
-    # すべてのレベルのログが記録されていることを確認
-    log_levels = [log["level"] for log in logs[-4:]]
-    for level in test_levels:
+    # 設定レベル以上のログのみ記録されていることを確認
+    log_levels = [log["level"] for log in logs[-3:]]
+    for level in ["info", "warning", "error"]:
         assert level in log_levels
+    assert "debug" not in [log["level"] for log in logs]
+
+def test_debug_level_records_all_levels():
+    """DEBUGレベルではすべてのログが記録されるテスト"""
+    debugger = AgnoMCPDebugger(level="debug")
+    test_levels = ["debug", "info", "warning", "error"]
+    
+    for level in test_levels:
+        debugger.log("テストメッセージ", level)
+    
+    log_levels = [log["level"] for log in debugger.get_recent_logs(4)]
+    assert log_levels == test_levels
+
+def test_log_entry_storage(debugger):
+    """ログエントリの保持形式のテスト"""
+    debugger.log("エントリテスト", "info", {"key": "value"})
+    
+    # メモリ内ではLogEntryとして保持
+    entry = debugger.logs[-1]
+    assert isinstance(entry, LogEntry)
+    assert not hasattr(entry, "__dict__")
+    
+    # 取得時は辞書形式に変換される
+    log = debugger.get_recent_logs(1)[0]
+    assert log["message"] == "エントリテスト"
+    assert log["level"] == "info"
+    assert log["data"] == {"key": "value"}
+    assert isinstance(log["timestamp"], str)
 
 def test_tool_call_tracing(debugger):
     """ツールコールのトレーステスト"""
@@ -94,6 +126,16 @@ def test_tool_call_tracing(debugger):
         assert call["duration"] == test_calls[i]["duration"]
         assert "timestamp" in call
 
+def test_tool_call_large_values_truncated(debugger):
+    """大きなツール引数・結果の切り詰めテスト"""
+    limit = debugger.max_value_length
+    debugger.record_tool_call("big_tool", {"data": "y" * (limit * 2)}, list(range(limit)), 0.1)
+    
+    call = debugger.get_tool_calls(1)[0]
+    assert isinstance(call["args"], str)
+    assert call["args"].endswith("...<truncated>")
+    assert len(call["result"]) == limit + len("...<truncated>")
+
 def test_error_recording(debugger):
     """エラー記録のテスト"""
     # 最初のカウントを記録
@@ -210,27 +252,48 @@ def test_clear_errors(debugger):
     debugger.clear_errors()
     assert len(debugger.get_errors()) == 0
 
-def test_log_rotation(info_debugger):
+def test_log_rotation(tmp_path):
     """ログローテーションのテスト"""
-    # テストサイズを縮小（1MB程度）
+    # ローテーションが確実に起きるよう上限を小さくする（64KB）
+    debugger = AgnoMCPDebugger(level="info", log_dir=str(tmp_path), max_log_size=64 * 1024)
     large_message = "x" * 1000  # 1KB
-    for i in range(1000):  # 約1MB
-        info_debugger.log(f"{large_message} - {i}", "info")
+    for i in range(200):  # 約200KB
+        debugger.log(f"{large_message} - {i}", "info")
+    # ファイルへの書き込みはバックグラウンドで行われるため完了を待つ
+    debugger.flush()
     
     # ログファイルのサイズを確認
-    log_file_size = os.path.getsize(info_debugger.log_file)
-    assert log_file_size < 1024 * 1024  # 1MB未満であることを確認
+    log_file_size = os.path.getsize(debugger.log_file)
+    assert log_file_size <= debugger.max_log_size
     
-    # ローテーションされたファイルの存在を確認
-    log_dir = Path("logs")
-    rotated_logs = list(log_dir.glob("*.log.*"))
-    assert len(rotated_logs) > 0
+    # このデバッガーのログファイルがローテーションされたことを確認
+    rotated_log = Path(f"{debugger.log_file}.1")
+    assert rotated_log.exists()
     
     # ローテーションされたファイルの内容を確認
-    if rotated_logs:
-        with open(rotated_logs[0], 'r') as f:
-            content = f.read()
-            assert "x" in content  # ログメッセージが含まれていることを確認
+    content = rotated_log.read_text(encoding="utf-8")
+    assert large_message in content  # ログメッセージが含まれていることを確認
+
+def test_multiple_debuggers_keep_own_log_files(tmp_path):
+    """複数のデバッガーが互いのログファイル出力を止めないことのテスト"""
+    first = AgnoMCPDebugger(level="info", log_dir=str(tmp_path))
+    second = AgnoMCPDebugger(level="debug", log_dir=str(tmp_path))
+    assert first.log_file != second.log_file
+    assert first.logger.level == 20
+    
+    first.log("first message", "info")
+    second.log("second message", "info")
+    first.close()
+    second.log("after close", "info")
+    second.flush()
+    
+    first_content = first.log_file.read_text(encoding="utf-8")
+    second_content = second.log_file.read_text(encoding="utf-8")
+    assert "first message" in first_content
+    assert "second message" not in first_content
+    assert "second message" in second_content
+    assert "after close" in second_content
+    second.close()
 
 def test_concurrent_logging(info_debugger):
     """並行ログ記録のテスト"""
@@ -2,8 +2,10 @@
 
 import pytest
 import os
+import sys
 import time
-from datetime import datetime
+from collections import deque
+from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
 from ollama_mcp.debug_module import AgnoMCPDebugger
 from ollama_mcp.visualizer import MCPServerVisualizer, MCPVisualizer
@@ -29,7 +31,8 @@ def test_server_visualizer_initialization(server_visualizer):
     assert isinstance(server_visualizer.metrics_cache, dict)
     assert isinstance(server_visualizer.tool_stats, dict)
     assert isinstance(server_visualizer.error_stats, dict)
-    assert isinstance(server_visualizer.performance_history, list)
+    assert isinstance(server_visualizer.performance_history, deque)
+    assert server_visualizer.performance_history.maxlen is not None
 
 def test_mcp_visualizer_initialization(mcp_visualizer):
     """MCPビジュアライザーの初期化テスト"""
@@ -57,6 +60,24 @@ def test_tool_stats_update(server_visualizer, debugger):
     assert server_visualizer.tool_stats["success"]["test_tool2"] == 100.0
     assert "test_tool0" in server_visualizer.tool_stats["last_used"]
 
+def test_tool_stats_incremental_update(server_visualizer, debugger):
+    """ツール統計の差分更新テスト"""
+    import asyncio
+    debugger.record_tool_call("test_tool", {"arg": "value"}, "result", 0.1)
+    asyncio.run(server_visualizer.update_tool_stats())
+    
+    # 新しいツールコールがなければ再集計しても件数は変わらない
+    asyncio.run(server_visualizer.update_tool_stats())
+    assert server_visualizer.tool_stats["calls"]["test_tool"] == 1
+    
+    # 新しいツールコールだけが累積される
+    debugger.record_tool_call("test_tool", {"arg": "value"}, "Error: failed", 0.3)
+    asyncio.run(server_visualizer.update_tool_stats())
+    
+    assert server_visualizer.tool_stats["calls"]["test_tool"] == 2
+    assert server_visualizer.tool_stats["duration"]["test_tool"] == pytest.approx(0.2)
+    assert server_visualizer.tool_stats["success"]["test_tool"] == 50.0
+
 def test_error_stats_update(server_visualizer, debugger):
     """エラー統計更新のテスト"""
     # テスト用のエラーを記録
@@ -96,6 +117,25 @@ def test_chart_generation(server_visualizer):
     assert isinstance(error_dist_chart, plt.Figure)
     assert isinstance(success_chart, plt.Figure)
 
+def test_chart_generation_with_mixed_timestamps(server_visualizer, debugger):
+    """精度の異なるタイムスタンプが混在してもチャートを生成できることのテスト"""
+    import asyncio
+    now = datetime.now().replace(microsecond=0)
+    timestamps = [now.isoformat(), (now + timedelta(microseconds=123456)).isoformat()]
+    for ts in timestamps:
+        debugger.tool_calls.append({"tool": "test_tool", "args": {}, "result": "result", "duration": 0.1, "timestamp": ts})
+    asyncio.run(server_visualizer.update_error_stats(
+        [{"type": "test_error", "timestamp": ts, "details": {}} for ts in timestamps]
+    ))
+    
+    perf_chart = server_visualizer.generate_performance_chart()
+    error_chart = server_visualizer.generate_error_trend_chart()
+    
+    # 結果を検証（チャート生成エラーにならず、データが描画されている）
+    assert not any(error["type"] == "chart_generation_error" for error in debugger.get_errors())
+    assert len(perf_chart.axes[0].lines) == 1
+    assert len(error_chart.axes[0].lines) == 1
+
 def test_table_generation(server_visualizer, debugger):
     """テーブル生成のテスト"""
     # テスト用のデータを準備
@@ -140,4 +180,111 @@ def test_metrics_summary(server_visualizer, debugger):
     assert "tool_metrics" in summary
     assert "error_metrics" in summary
     assert "total_calls" in summary["tool_metrics"]
-    assert "total_errors" in summary["error_metrics"]
\ No newline at end of file
+    assert "total_errors" in summary["error_metrics"]
+
+
+def test_generate_all_charts(server_visualizer):
+    """全チャートの並行生成テスト"""
+    import asyncio
+    charts = asyncio.run(server_visualizer.generate_all_charts())
+    
+    # 結果を検証
+    assert len(charts) == 6
+    assert all(isinstance(chart, plt.Figure) for chart in charts)
+    
+    # 次の生成で新しい図が描かれても、返した図はクリアされない
+    next_charts = asyncio.run(server_visualizer.generate_all_charts())
+    assert next_charts[1] is not charts[1]
+    assert all(len(chart.axes) == 1 for chart in charts)
+
+
+def test_generate_all_charts_concurrent(server_visualizer, debugger):
+    """重なったチャート生成要求が1回の生成にまとめられることのテスト"""
+    import asyncio
+    for i in range(3):
+        debugger.record_tool_call(f"test_tool{i}", {"arg": "value"}, "result", 0.1)
+        debugger.record_error(f"error_type{i}", "Error message", {"tool": f"test_tool{i}"})
+    
+    async def refresh_concurrently():
+        return await asyncio.gather(
+            server_visualizer.update_metrics(),
+            *(server_visualizer.generate_all_charts() for _ in range(4))
+        )
+    
+    _, *results = asyncio.run(refresh_concurrently())
+    
+    # 同時に来た要求は同じ生成結果を受け取る
+    assert all(result is results[0] for result in results)
+    # 各チャートの図は軸を1つだけ持つ（同じ図が並行して描き直されていない）
+    assert len(server_visualizer._figs) == 6
+    assert all(len(fig.axes) == 1 for fig in server_visualizer._figs.values())
+
+
+def test_generate_all_charts_while_logging(server_visualizer, debugger):
+    """チャート生成中にログやツールコールが追記されてもエラーにならないことのテスト"""
+    import asyncio
+    for i in range(debugger.max_tool_calls):
+        debugger.record_tool_call(f"test_tool{i}", {"arg": "value"}, "result", 0.1)
+    
+    async def render_while_logging():
+        for _ in range(20):
+            task = asyncio.create_task(server_visualizer.generate_all_charts())
+            while not task.done():
+                debugger.log("Connected to MCP server", "info")
+                debugger.record_tool_call("test_tool", {"arg": "value"}, "result", 0.1)
+                await asyncio.sleep(0)
+            await task
+    
+    # スレッドの切り替えを頻繁にして、デックの読み取り中に追記が起きやすくする
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        asyncio.run(render_while_logging())
+    finally:
+        sys.setswitchinterval(interval)
+    
+    # ワーカースレッドがデバッガーのデックを読まないため、生成エラーは記録されない
+    errors = debugger.get_errors(debugger.max_errors)
+    assert not [error for error in errors if error["type"] == "chart_generation_error"]
+
+
+def test_chart_reused_until_stats_change(server_visualizer, debugger):
+    """統計が変わるまでチャートを描き直さないことのテスト"""
+    import asyncio
+    debugger.record_tool_call("test_tool", {"arg": "value"}, "result", 0.1)
+    asyncio.run(server_visualizer.update_tool_stats())
+    
+    chart = server_visualizer.generate_tool_usage_chart()
+    bars = list(chart.axes[0].patches)
+    
+    # 統計が変わっていなければ描画済みの図がそのまま返される
+    assert server_visualizer.generate_tool_usage_chart().axes[0].patches[0] is bars[0]
+    
+    # 統計が変わると描き直される
+    debugger.record_tool_call("other_tool", {"arg": "value"}, "result", 0.1)
+    asyncio.run(server_visualizer.update_tool_stats())
+    assert len(server_visualizer.generate_tool_usage_chart().axes[0].patches) == 2
+
+def test_dashboard_cache(mcp_visualizer):
+    """ダッシュボードのチャートキャッシュのテスト"""
+    import asyncio
+    first = asyncio.run(mcp_visualizer.update_dashboard())
+    
+    # 更新間隔内ではキャッシュされたチャートが返される
+    assert asyncio.run(mcp_visualizer.update_dashboard()) is first
+    
+    # 更新間隔を変更するとキャッシュは破棄される
+    mcp_visualizer.set_update_interval(10)
+    assert asyncio.run(mcp_visualizer.update_dashboard()) is not first
+
+
+def test_details_fetch_metrics_on_first_open(mcp_visualizer, debugger):
+    """詳細情報タブを最初に開いたときにメトリクスを取得することのテスト"""
+    import asyncio
+    debugger.record_tool_call("test_tool", {"arg": "value"}, "result", 0.1)
+    
+    tool_details, _, summary = asyncio.run(mcp_visualizer.update_details())
+    
+    # 結果を検証（ダッシュボードを開く前でも集計済みのデータが表示される）
+    assert tool_details[1][0] == "test_tool"
+    assert summary["tool_metrics"]["total_calls"] == 1